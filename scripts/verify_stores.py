@@ -3,10 +3,12 @@
 
 import asyncio
 import sys
+from collections import Counter
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
+from src.config import load_store_urls
 from src.onlinestores import scrape_urls
 
 
@@ -16,22 +18,21 @@ async def main():
     print("FINAL VERIFICATION - ALL ONLINE STORES")
     print("=" * 70)
 
-    products = await scrape_urls([])
+    # Every configured URL in one call: scrape_urls fetches the stores
+    # concurrently (bounded) alongside the Coop chains
+    urls = [url for store_urls in load_store_urls().values() for url in store_urls]
+    products = await scrape_urls(urls)
 
-    # Group by store
-    by_store = {}
-    for p in products:
-        store = p["store"]
-        by_store.setdefault(store, []).append(p)
+    # Count products per store
+    counts = Counter(p["store"] for p in products)
 
     # Verify each store
     required_stores = {"MENY", "SPAR", "JOKER", "ODA"}
-    found_stores = set(by_store.keys())
 
     print("\n✅ Store Status:")
     all_ok = True
     for store in sorted(required_stores):
-        count = len(by_store.get(store, []))
+        count = counts[store]
         status = "✅ OK" if count > 0 else "❌ FAILED"
         print(f"  {store:10s}: {count:3d} products {status}")
         if count == 0:
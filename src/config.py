@@ -2,13 +2,23 @@
 
 from __future__ import annotations
 
+import copy
 import os
 from pathlib import Path
+from typing import Any, Callable
 
-import yaml
-from dotenv import load_dotenv
 
-load_dotenv()
+def _load_env() -> None:
+    """Load .env once per process tree (child processes inherit the flag)."""
+    if os.environ.get("_DOTENV_LOADED"):
+        return
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    os.environ["_DOTENV_LOADED"] = "1"
+
+
+_load_env()
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 CONFIG_DIR = BASE_DIR / "config"
@@ -16,10 +26,34 @@ DATA_DIR = BASE_DIR / "data"
 DATA_DIR.mkdir(exist_ok=True)
 
 
+# Parsed config files keyed by path → (mtime, size, parsed data).
+# Re-parsed only when the file changes on disk.
+_FILE_CACHE: dict[Path, tuple[float, int, Any]] = {}
+
+
+def _load_cached(path: Path, parse: Callable[[Path], Any]) -> Any:
+    """Return a deep copy of *path* parsed by *parse*, cached on (mtime, size)."""
+    st = path.stat()
+    cached = _FILE_CACHE.get(path)
+    if cached is None or cached[:2] != (st.st_mtime, st.st_size):
+        cached = (st.st_mtime, st.st_size, parse(path))
+        _FILE_CACHE[path] = cached
+    # Callers may mutate the result (e.g. groups), so never hand out the cache
+    return copy.deepcopy(cached[2])
+
+
+def _parse_yaml(path: Path) -> Any:
+    # Imported on first parse; the file cache means at most once per change
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=loader)
+
+
 def load_groups() -> dict:
     """Load group definitions from YAML config."""
-    with open(CONFIG_DIR / "groups.yaml", "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    return _load_cached(CONFIG_DIR / "groups.yaml", _parse_yaml)
 
 
 # --- API keys / env ---
@@ -59,10 +93,15 @@ def load_store_urls() -> dict[str, list[str]]:
     Returns dict mapping store names to lists of URLs.
     Example: {"oda": ["https://oda.com/...", ...], "spar": [...]}
     """
-    links_file = BASE_DIR / "config" / "online_store_links.txt"
-    if not links_file.exists():
+    links_file = CONFIG_DIR / "online_store_links.txt"
+    try:
+        return _load_cached(links_file, _parse_store_links)
+    except FileNotFoundError:
+        _FILE_CACHE.pop(links_file, None)
         return {}
 
+
+def _parse_store_links(links_file: Path) -> dict[str, list[str]]:
     store_urls: dict[str, list[str]] = {}
     current_store = None
 
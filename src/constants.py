@@ -6,6 +6,8 @@ scattered across multiple files, improving maintainability.
 
 from __future__ import annotations
 
+import re
+
 # ---------------------------------------------------------------------------
 # Unit display labels
 # ---------------------------------------------------------------------------
@@ -45,6 +47,14 @@ EXCLUDED_KASSAL_STORES: list[str] = [
     "oda",
 ]
 
+# Each list as one case-insensitive substring alternation
+EXCLUDED_STORES_RE = re.compile(
+    "|".join(re.escape(s) for s in EXCLUDED_STORES), re.IGNORECASE
+)
+EXCLUDED_KASSAL_STORES_RE = re.compile(
+    "|".join(re.escape(s) for s in EXCLUDED_KASSAL_STORES), re.IGNORECASE
+)
+
 # ---------------------------------------------------------------------------
 # eTilbudsavis / Holdbart
 # ---------------------------------------------------------------------------
@@ -10,11 +10,12 @@ Tables:
 
 from __future__ import annotations
 
+import atexit
 import logging
 import sqlite3
-from datetime import date, datetime
+from datetime import date
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 from src.config import DATA_DIR
 
@@ -22,14 +23,44 @@ logger = logging.getLogger(__name__)
 
 DB_PATH = DATA_DIR / "price_history.db"
 
+# Shared connection, reopened only if DB_PATH changes (e.g. in tests)
+_CONN: sqlite3.Connection | None = None
+_CONN_PATH: Path | None = None
+
 
 def _connect() -> sqlite3.Connection:
+    """Return the shared connection, opening it (and applying PRAGMAs) once."""
+    global _CONN, _CONN_PATH
+    if _CONN is not None and _CONN_PATH == DB_PATH:
+        return _CONN
+    close_db()
+
+    # Plain tuple rows by default; queries that want named access opt in
+    # per cursor.
     conn = sqlite3.connect(str(DB_PATH))
-    conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA journal_mode=WAL")
+    # NORMAL is safe under WAL; a crash can at worst lose the last commit,
+    # which the next run simply re-records.
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA cache_size=-8000")  # 8 MB
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=134217728")  # 128 MB
+    _CONN, _CONN_PATH = conn, DB_PATH
     return conn
 
 
+def close_db() -> None:
+    """Close the shared connection, if open."""
+    global _CONN, _CONN_PATH
+    if _CONN is not None:
+        _CONN.close()
+    _CONN = None
+    _CONN_PATH = None
+
+
+atexit.register(close_db)
+
+
 def init_db() -> None:
     """Create tables if they don't exist."""
     conn = _connect()
@@ -58,14 +89,17 @@ def init_db() -> None:
             UNIQUE(group_name, run_date, item_key)
         );
 
-        CREATE INDEX IF NOT EXISTS idx_ph_group
-            ON price_history(group_name);
-        CREATE INDEX IF NOT EXISTS idx_ih_group
-            ON item_history(group_name);
+        -- The UNIQUE constraints above already index (group_name, run_date)
+        -- as a leftmost prefix, which serves every query in this module.
+        -- Older databases carry redundant single-column indexes; drop them.
+        DROP INDEX IF EXISTS idx_ph_group;
+        DROP INDEX IF EXISTS idx_ih_group;
+
+        -- Refresh planner statistics when they are stale
+        PRAGMA optimize;
         """
     )
     conn.commit()
-    conn.close()
     logger.debug("Database initialized at %s", DB_PATH)
 
 
@@ -77,28 +111,27 @@ def init_db() -> None:
 def get_all_time_best(group_name: str) -> float | None:
     """Return the lowest unit price ever recorded for a group, or None."""
     conn = _connect()
-    row = conn.execute(
-        "SELECT MIN(best_price) AS best FROM price_history WHERE group_name = ?",
+    (best,) = conn.execute(
+        "SELECT MIN(best_price) FROM price_history WHERE group_name = ?",
         (group_name,),
     ).fetchone()
-    conn.close()
-    if row and row["best"] is not None:
-        return float(row["best"])
+    if best is not None:
+        return float(best)
     return None
 
 
 def get_previous_best(group_name: str) -> dict[str, Any] | None:
     """Return the most recent (before today) best price record for a group."""
     today = date.today().isoformat()
-    conn = _connect()
-    row = conn.execute(
+    cur = _connect().cursor()
+    cur.row_factory = sqlite3.Row
+    row = cur.execute(
         """SELECT best_price, best_item, best_store, run_date
            FROM price_history
            WHERE group_name = ? AND run_date < ?
            ORDER BY run_date DESC LIMIT 1""",
         (group_name, today),
     ).fetchone()
-    conn.close()
     if row:
         return dict(row)
     return None
@@ -109,15 +142,15 @@ def get_previous_top_ids(group_name: str) -> set[str]:
     today = date.today().isoformat()
     conn = _connect()
     rows = conn.execute(
-        """SELECT item_key FROM item_history
-           WHERE group_name = ? AND run_date = (
-               SELECT MAX(run_date) FROM item_history
+        """WITH latest AS (
+               SELECT MAX(run_date) AS run_date FROM item_history
                WHERE group_name = ? AND run_date < ?
-           )""",
-        (group_name, group_name, today),
+           )
+           SELECT item_key FROM item_history JOIN latest USING (run_date)
+           WHERE group_name = ?""",
+        (group_name, today, group_name),
     ).fetchall()
-    conn.close()
-    return {r["item_key"] for r in rows}
+    return {r[0] for r in rows}
 
 
 # ---------------------------------------------------------------------------
@@ -125,6 +158,11 @@ def get_previous_top_ids(group_name: str) -> set[str]:
 # ---------------------------------------------------------------------------
 
 
+def _today() -> str:
+    """Today's date as an ISO string — the run_date of a recorded run."""
+    return date.today().isoformat()
+
+
 def record_run(
     group_name: str,
     best_price: float,
@@ -132,28 +170,44 @@ def record_run(
     best_store: str | None,
     unit_label: str,
     top_items: list[dict[str, Any]],
+    today_fn: Callable[[], str] = _today,
 ) -> None:
-    """Record today's results for a group."""
-    today = date.today().isoformat()
-    conn = _connect()
-
-    # Upsert best price
-    conn.execute(
-        """INSERT INTO price_history (group_name, run_date, best_price,
-               best_item, best_store, unit_label)
-           VALUES (?, ?, ?, ?, ?, ?)
-           ON CONFLICT(group_name, run_date)
-           DO UPDATE SET best_price = excluded.best_price,
-                         best_item  = excluded.best_item,
-                         best_store = excluded.best_store,
-                         unit_label = excluded.unit_label""",
-        (group_name, today, best_price, best_item, best_store, unit_label),
-    )
+    """Record today's results for a group.
+
+    *today_fn* supplies the run date; tests pass a fixed one.
+    """
+    today = today_fn()
+    rows = [
+        (
+            group_name,
+            today,
+            f"{item.get('source', '')}:{item.get('source_id', '')}",
+            item.get("name", ""),
+            item.get("normalized_unit_price", 0),
+            item.get("price", 0),
+            item.get("store", ""),
+        )
+        for item in top_items
+    ]
 
-    # Record individual items
-    for item in top_items:
-        item_key = f"{item.get('source', '')}:{item.get('source_id', '')}"
+    conn = _connect()
+    # One transaction: committed on success, rolled back on error
+    with conn:
+        # Upsert best price
         conn.execute(
+            """INSERT INTO price_history (group_name, run_date, best_price,
+                   best_item, best_store, unit_label)
+               VALUES (?, ?, ?, ?, ?, ?)
+               ON CONFLICT(group_name, run_date)
+               DO UPDATE SET best_price = excluded.best_price,
+                             best_item  = excluded.best_item,
+                             best_store = excluded.best_store,
+                             unit_label = excluded.unit_label""",
+            (group_name, today, best_price, best_item, best_store, unit_label),
+        )
+
+        # Record individual items
+        conn.executemany(
             """INSERT INTO item_history (group_name, run_date, item_key,
                    item_name, unit_price, price, store)
                VALUES (?, ?, ?, ?, ?, ?, ?)
@@ -161,16 +215,5 @@ def record_run(
                DO UPDATE SET unit_price = excluded.unit_price,
                              price      = excluded.price,
                              store      = excluded.store""",
-            (
-                group_name,
-                today,
-                item_key,
-                item.get("name", ""),
-                item.get("normalized_unit_price", 0),
-                item.get("price", 0),
-                item.get("store", ""),
-            ),
+            rows,
         )
-
-    conn.commit()
-    conn.close()
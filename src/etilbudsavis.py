@@ -9,6 +9,7 @@ from __future__ import annotations
 import logging
 import re
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Any
 
 import httpx
@@ -20,60 +21,95 @@ from src.config import (
     GEO_RADIUS,
 )
 from src.constants import HOLDBART_DEALER_ID
+from src.normalizer import UNIT_MAP, _unit_key
 
 logger = logging.getLogger(__name__)
 
 BASE_URL = "https://squid-api.tjek.com/v2"
 TIMEOUT = 20
 
+# Patterns used by normalize_offer (compiled once, applied per offer)
+_RE_PR_KG = re.compile(r"([\d]+(?:[,.]\d+)?)\s*(?:pr\.?\s*kg|kr/kg)", re.IGNORECASE)
+# All promo markers in one alternation, so the lowercased text is scanned
+# once. normalize_offer keeps the first match of each named group.
+_RE_PROMO = re.compile(
+    r"(?P<three_for_two>3 for 2|3for2)"
+    r"|(?P<two_for>\b2\s+for\s+\d)"
+    r"|spar\s+(?:kr\.?\s*|fra\s+kr\.?\s*)(?P<spar_kr>[\d,.]+)"
+    r"|(?P<spar>spar (?:kr|fra))"
+    r"|spar\s+(?P<spar_pct>[\d,.]+)\s*%"
+    r"|(?P<member>medlems)"
+    r"|-(?P<neg_pct>\d+)%"
+)
 
-async def fetch_holdbart_offers() -> list[dict[str, Any]]:
-    """Fetch ALL current Holdbart offers from the active catalog.
+# Shared client so all queries reuse pooled keep-alive connections
+_client: httpx.AsyncClient | None = None
 
-    Instead of searching by term (which misses many Holdbart products with
-    generic names), this fetches the active catalog and returns all offers.
-    """
-    async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-        # 1. Find active Holdbart catalog
-        resp = await client.get(
-            f"{BASE_URL}/catalogs",
+
+async def _get_client() -> httpx.AsyncClient:
+    """Return the shared API client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=TIMEOUT,
             headers=_headers(),
-            params={
-                "r_lat": GEO_LAT,
-                "r_lng": GEO_LNG,
-                "r_radius": 200000,
-                "dealer_ids": HOLDBART_DEALER_ID,
-            },
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
         )
-        resp.raise_for_status()
-        catalogs = resp.json()
+    return _client
 
-        if not catalogs:
-            logger.warning("No active Holdbart catalog found")
-            return []
 
-        # Use the most recent catalog
-        catalog_id = catalogs[0]["id"]
-        logger.info("Holdbart catalog: %s", catalog_id)
+async def aclose() -> None:
+    """Close the shared API client (call once at shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
 
-        # 2. Fetch all offers from the catalog
-        resp2 = await client.get(
-            f"{BASE_URL}/offers",
-            headers=_headers(),
-            params={
-                "catalog_ids": catalog_id,
-                "r_lat": GEO_LAT,
-                "r_lng": GEO_LNG,
-                "r_radius": 200000,
-                "limit": 100,
-            },
-        )
-        resp2.raise_for_status()
-        offers = resp2.json()
-        logger.info(
-            "Holdbart: fetched %d offers from catalog %s", len(offers), catalog_id
-        )
-        return offers
+
+async def fetch_holdbart_offers() -> list[dict[str, Any]]:
+    """Fetch ALL current Holdbart offers from the active catalog.
+
+    Instead of searching by term (which misses many Holdbart products with
+    generic names), this fetches the active catalog and returns all offers.
+    """
+    client = await _get_client()
+
+    # 1. Find active Holdbart catalog
+    resp = await client.get(
+        f"{BASE_URL}/catalogs",
+        params={
+            "r_lat": GEO_LAT,
+            "r_lng": GEO_LNG,
+            "r_radius": 200000,
+            "dealer_ids": HOLDBART_DEALER_ID,
+        },
+    )
+    resp.raise_for_status()
+    catalogs = resp.json()
+
+    if not catalogs:
+        logger.warning("No active Holdbart catalog found")
+        return []
+
+    # Use the most recent catalog
+    catalog_id = catalogs[0]["id"]
+    logger.info("Holdbart catalog: %s", catalog_id)
+
+    # 2. Fetch all offers from the catalog
+    resp2 = await client.get(
+        f"{BASE_URL}/offers",
+        params={
+            "catalog_ids": catalog_id,
+            "r_lat": GEO_LAT,
+            "r_lng": GEO_LNG,
+            "r_radius": 200000,
+            "limit": 100,
+        },
+    )
+    resp2.raise_for_status()
+    offers = resp2.json()
+    logger.info("Holdbart: fetched %d offers from catalog %s", len(offers), catalog_id)
+    return offers
 
 
 def _headers() -> dict[str, str]:
@@ -105,36 +141,49 @@ async def search_offers(
         "order_by": "-score",
     }
 
-    async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-        resp = await client.get(
-            f"{BASE_URL}/offers/search",
-            headers=_headers(),
-            params=params,
-        )
-        resp.raise_for_status()
-        offers = resp.json()
+    client = await _get_client()
+    resp = await client.get(f"{BASE_URL}/offers/search", params=params)
+    resp.raise_for_status()
+    offers = resp.json()
 
     # Keep only currently valid offers
     now = datetime.now(timezone.utc)
-    valid: list[dict[str, Any]] = []
-    for o in offers:
-        try:
-            valid_from = datetime.fromisoformat(
-                o.get("run_from", o.get("valid_from", ""))
-            )
-            valid_until = datetime.fromisoformat(
-                o.get("run_till", o.get("valid_until", ""))
-            )
-            if valid_from <= now <= valid_until:
-                valid.append(o)
-        except (ValueError, TypeError):
-            # If dates are missing/unparseable, include offer anyway
-            valid.append(o)
+    valid = [o for o in offers if _is_current(o, now)]
 
     logger.info("eTilbudsavis '%s': %d total, %d valid", query, len(offers), len(valid))
     return valid
 
 
+@lru_cache(maxsize=256)
+def _parse_timestamp(value: str) -> datetime | None:
+    """Parse an offer timestamp; None if missing, malformed or naive.
+
+    Offers from one catalog share the same run dates, so the cache makes
+    this one parse per distinct string rather than two per offer.
+    """
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo is not None else None
+
+
+def _is_current(offer: dict[str, Any], now: datetime) -> bool:
+    """Return True if *offer* is valid at *now*.
+
+    Offers whose dates are missing or unparseable are kept.
+    """
+    valid_from = _parse_timestamp(
+        offer.get("run_from") or offer.get("valid_from") or ""
+    )
+    valid_until = _parse_timestamp(
+        offer.get("run_till") or offer.get("valid_until") or ""
+    )
+    if valid_from is None or valid_until is None:
+        return True
+    return valid_from <= now <= valid_until
+
+
 def normalize_offer(offer: dict[str, Any]) -> dict[str, Any] | None:
     """Convert a raw eTilbudsavis offer into a normalized item dict.
 
@@ -144,12 +193,13 @@ def normalize_offer(offer: dict[str, Any]) -> dict[str, Any] | None:
       source, source_id, name, price, unit_price, base_unit,
       store, valid_from, valid_until, url, image, pack_size, weight, weight_unit
     """
-    pricing = offer.get("pricing", {}) or {}
+    pricing = offer.get("pricing") or {}
     price = pricing.get("price") or offer.get("price")
     pre_price = pricing.get("pre_price")
 
     if price is None:
         return None
+    desc = offer.get("description") or ""
 
     # --- Quantity / weight / unit ---
     quantity = offer.get("quantity", {}) or {}
@@ -186,10 +236,7 @@ def normalize_offer(offer: dict[str, Any]) -> dict[str, Any] | None:
 
     # Fallback: parse from description like "145,63 pr. kg"
     if unit_price is None:
-        desc = offer.get("description") or ""
-        m = re.search(
-            r"([\d]+(?:[,.]\d+)?)\s*(?:pr\.?\s*kg|kr/kg)", desc, re.IGNORECASE
-        )
+        m = _RE_PR_KG.search(desc)
         if m:
             unit_price = float(m.group(1).replace(",", "."))
             base_unit = "kilogram"
@@ -215,38 +262,35 @@ def normalize_offer(offer: dict[str, Any]) -> dict[str, Any] | None:
         url = f"https://etilbudsavis.no/{market_slug}?publication={catalog_id}&offer={offer_id}"
 
     # --- Detect promotions ---
-    desc_lower = (offer.get("description") or "").lower()
-    heading_lower = (offer.get("heading") or "").lower()
-    combined = desc_lower + " " + heading_lower
+    combined = desc.lower() + " " + (offer.get("heading") or "").lower()
+    found: dict[str, str] = {}
+    for m in _RE_PROMO.finditer(combined):
+        kind = m.lastgroup
+        if kind and kind not in found:
+            found[kind] = m.group(kind)
     promos: list[str] = []
     if pre_price is not None:
         promos.append(f"Før {pre_price:.0f} kr")
-    if "3 for 2" in combined or "3for2" in combined:
+    if "three_for_two" in found:
         promos.append("3 for 2")
-    if re.search(r"\b2\s+for\s+\d", combined):
+    if "two_for" in found:
         promos.append("2 for ...")
-    if "spar kr" in combined or "spar fra" in combined:
-        m_spar = re.search(r"spar\s+(?:kr\.?\s*|fra\s+kr\.?\s*)([\d,.]+)", combined)
-        if m_spar:
-            promos.append(f"Spar {m_spar.group(1)} kr")
-        else:
-            promos.append("Spar")
-    elif re.search(r"spar\s+\d", combined):
-        m_spar = re.search(r"spar\s+([\d,.]+)\s*%", combined)
-        if m_spar:
-            promos.append(f"Spar {m_spar.group(1)}%")
-    if "medlems" in combined:
+    if "spar_kr" in found:
+        promos.append(f"Spar {found['spar_kr']} kr")
+    elif "spar" in found:
+        promos.append("Spar")
+    elif "spar_pct" in found:
+        promos.append(f"Spar {found['spar_pct']}%")
+    if "member" in found:
         promos.append("Medlemsrabatt")
-    if re.search(r"-\d+%", combined):
-        m_pct = re.search(r"-(\d+)%", combined)
-        if m_pct:
-            promos.append(f"-{m_pct.group(1)}%")
+    if "neg_pct" in found:
+        promos.append(f"-{found['neg_pct']}%")
 
     return {
         "source": "etilbudsavis",
         "source_id": offer.get("id") or offer.get("publicId", ""),
         "name": offer.get("heading", offer.get("name", "")).strip(),
-        "description": (offer.get("description") or "").strip(),
+        "description": desc.strip(),
         "price": float(price) if price else None,
         "pre_price": float(pre_price) if pre_price else None,
         "unit_price": round(unit_price, 2) if unit_price else None,
@@ -269,22 +313,5 @@ def _map_unit(raw: str | None) -> str | None:
     """Map eTilbudsavis baseUnit strings to canonical units."""
     if not raw:
         return None
-    mapping = {
-        "kg": "kilogram",
-        "kilogram": "kilogram",
-        "g": "kilogram",  # will need weight conversion
-        "l": "liter",
-        "liter": "liter",
-        "litre": "liter",
-        "dl": "liter",
-        "ml": "liter",
-        "cl": "liter",
-        "stk": "piece",
-        "stk.": "piece",
-        "pcs": "piece",
-        "piece": "piece",
-        "pieces": "piece",
-        "pk": "piece",
-        "pakke": "piece",
-    }
-    return mapping.get(raw.lower().strip(), raw.lower().strip())
+    key = _unit_key(raw)
+    return UNIT_MAP.get(key, key)
@@ -4,19 +4,58 @@ from __future__ import annotations
 
 import logging
 import re
-from typing import Any
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Iterable, Iterator
 
-from src.constants import EXCLUDED_STORES
+from src.constants import EXCLUDED_KASSAL_STORES_RE, EXCLUDED_STORES_RE
 
 logger = logging.getLogger(__name__)
 
 
+# Trailing weight/volume like "1000g", "750 ml", "1,5l", "4x125g".
+# The lookbehind stops the engine retrying from every digit of a number.
+_RE_WEIGHT_SUFFIX = re.compile(
+    r"\s*(?<!\d)\d+(?:[x×]\d*)?(?:[.,]\d+)?\s*(?:kg|g|l|dl|ml|cl|pk|stk)\b.*$",
+    re.IGNORECASE,
+)
+
+
 def _is_excluded_store(item: dict[str, Any]) -> bool:
-    """Check if the item's store is globally excluded."""
-    store = (item.get("store") or "").lower().strip()
+    """Check if the item's store is globally excluded.
+
+    Kassal items use the wider kassal exclusion list, so an excluded
+    store never reaches cross-store dedup.
+    """
+    store = item.get("store")
     if not store:
         return False
-    return any(excl in store for excl in EXCLUDED_STORES)
+    if item.get("source") == "kassal":
+        return bool(EXCLUDED_KASSAL_STORES_RE.search(store))
+    return bool(EXCLUDED_STORES_RE.search(store))
+
+
+@lru_cache(maxsize=256)
+def _terms_re(terms: tuple[str, ...]) -> re.Pattern[str] | None:
+    """Compile lower-cased substring *terms* into one alternation, or None.
+
+    Cached on the terms themselves, so reloaded groups reuse the pattern
+    and an edited term list simply compiles a new one.
+    """
+    lowered = [t.lower() for t in terms]
+    return re.compile("|".join(map(re.escape, lowered))) if lowered else None
+
+
+def _compile_group(group: dict[str, Any]) -> dict[str, Any]:
+    """Return the group's filter terms as compiled, lower-cased regexes."""
+    return {
+        "name": group.get("name"),
+        "exclude_re": _terms_re(tuple(group.get("exclude", []))),
+        "exclude_category_re": _terms_re(tuple(group.get("exclude_category", []))),
+        "include_re": _terms_re(
+            tuple(group.get("include_any", group.get("include", [])))
+        ),
+    }
 
 
 def matches_group(item: dict[str, Any], group: dict[str, Any]) -> bool:
@@ -27,62 +66,89 @@ def matches_group(item: dict[str, Any], group: dict[str, Any]) -> bool:
       exclude          – item name must NOT contain any of these
       exclude_category – item category must NOT contain any of these
     """
-    name = (item.get("name") or "").lower()
-    category = (item.get("category") or "").lower() if item.get("category") else ""
-
+    return _matches_compiled(
+        item,
+        _compile_group(group),
+        (item.get("name") or "").lower(),
+        (item.get("category") or "").lower(),
+    )
+
+
+def _matches_compiled(
+    item: dict[str, Any],
+    compiled: dict[str, Any],
+    name: str,
+    category: str,
+) -> bool:
+    """matches_group() body, taking the compiled group and lowered fields.
+
+    Checks run cheapest first: name excludes, category excludes, includes.
+    """
     # --- Exclude filter (hard block on name) ---
-    excludes: list[str] = group.get("exclude", [])
-    for term in excludes:
-        if term.lower() in name:
-            logger.debug(
-                "EXCLUDED '%s' — matched exclude term '%s'", item.get("name"), term
-            )
-            return False
+    exclude_re = compiled["exclude_re"]
+    if exclude_re is not None and (m := exclude_re.search(name)):
+        logger.debug(
+            "EXCLUDED '%s' — matched exclude term '%s'", item.get("name"), m.group()
+        )
+        return False
 
     # --- Exclude filter (hard block on category) ---
-    cat_excludes: list[str] = group.get("exclude_category", [])
-    for term in cat_excludes:
-        if term.lower() in category:
+    exclude_category_re = compiled["exclude_category_re"]
+    if category and exclude_category_re is not None:
+        if m := exclude_category_re.search(category):
             logger.debug(
                 "EXCLUDED '%s' — matched category exclude '%s' (cat=%s)",
                 item.get("name"),
-                term,
+                m.group(),
                 category,
             )
             return False
 
     # --- Include filter (must match at least one) ---
-    includes: list[str] = group.get("include_any", group.get("include", []))
-    if includes:
-        found = any(term.lower() in name for term in includes)
-        if not found:
-            # Also try category matching as fallback
-            if category:
-                found = any(term.lower() in category for term in includes)
-            if not found:
-                logger.debug(
-                    "SKIPPED '%s' — no include match for group '%s'",
-                    item.get("name"),
-                    group.get("name"),
-                )
-                return False
+    include_re = compiled["include_re"]
+    if include_re is not None:
+        # Fall back to category matching if the name has no include term
+        if not include_re.search(name) and not (
+            category and include_re.search(category)
+        ):
+            logger.debug(
+                "SKIPPED '%s' — no include match for group '%s'",
+                item.get("name"),
+                compiled["name"],
+            )
+            return False
 
     return True
 
 
-def filter_items(
-    items: list[dict[str, Any]],
+def iter_filtered(
+    items: Iterable[dict[str, Any]],
     group: dict[str, Any],
-) -> list[dict[str, Any]]:
-    """Return only items that pass the group's include/exclude rules.
+) -> Iterator[dict[str, Any]]:
+    """Yield only items that pass the group's include/exclude rules.
 
     Also drops items from globally excluded stores.
     """
-    return [
-        item
-        for item in items
-        if not _is_excluded_store(item) and matches_group(item, group)
-    ]
+    compiled = _compile_group(group)
+    for item in items:
+        # Store exclusion first — the cheapest check
+        if _is_excluded_store(item):
+            continue
+        if _matches_compiled(
+            item,
+            compiled,
+            (item.get("name") or "").lower(),
+            (item.get("category") or "").lower(),
+        ):
+            yield item
+
+
+def filter_items(
+    items: Iterable[dict[str, Any]],
+    group: dict[str, Any],
+) -> list[dict[str, Any]]:
+    """List form of iter_filtered()."""
+    return list(iter_filtered(items, group))
 
 
 def _strip_weight(name: str) -> str:
@@ -91,17 +157,11 @@ def _strip_weight(name: str) -> str:
     E.g. 'coop kyllingfilet 1000g' → 'coop kyllingfilet'
          'xtra kokt skinke 250g'   → 'xtra kokt skinke'
     """
-    # Remove trailing weight like "1000g", "750 ml", "1,5l", "4x125g"
-    stripped = re.sub(
-        r"\s*\d+[x×]?\d*(?:[.,]\d+)?\s*(?:kg|g|l|dl|ml|cl|pk|stk)\b.*$",
-        "",
-        name,
-        flags=re.IGNORECASE,
-    ).strip()
+    stripped = _RE_WEIGHT_SUFFIX.sub("", name).strip()
     return stripped or name
 
 
-def deduplicate(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+def deduplicate(items: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
     """Remove duplicate items.
 
     Dedup keys (in priority order):
@@ -113,37 +173,33 @@ def deduplicate(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
       - Same product (EAN or name) at multiple stores → keep cheapest.
       - If same price, merge store names (e.g. "SPAR / Meny").
     """
-    seen: set[str] = set()
+    # Tuple keys, tagged by kind, hash faster than formatted strings
+    seen: set[tuple[Any, ...]] = set()
     unique: list[dict[str, Any]] = []
 
     for item in items:
         # Primary key: source+source_id
-        key = f"{item.get('source')}:{item.get('source_id')}"
-        if not item.get("source_id"):
+        source_id = item.get("source_id")
+        if source_id:
+            key = ("id", item.get("source"), source_id)
+        else:
             # Fallback to ean+store
-            key = f"{item.get('ean', '')}:{item.get('store', '')}"
+            key = ("ean", item.get("ean", ""), item.get("store", ""))
 
         if key in seen:
             continue
         seen.add(key)
 
-        # Cross-source dedup: normalize name + store
+        # Cross-source dedup: stripped name (no weight suffix) + store + price.
+        # Catches "COOP KYLLINGFILET" vs "Coop Kyllingfilet 1000g", and
+        # subsumes an exact-name key (equal names strip to equal names).
         raw_name = (item.get("name") or "").lower().strip()
         store = (item.get("store") or "").lower().strip()
-        price = item.get("price", 0)
-        cross_key = f"x:{raw_name}:{store}:{price}"
+        cross_key = ("xs", _strip_weight(raw_name), store, item.get("price", 0))
         if cross_key in seen:
             continue
         seen.add(cross_key)
 
-        # Cross-source dedup: stripped name (no weight suffix) + store + price
-        # Catches "COOP KYLLINGFILET" vs "Coop Kyllingfilet 1000g"
-        stripped = _strip_weight(raw_name)
-        cross_key2 = f"xs:{stripped}:{store}:{price}"
-        if cross_key2 in seen:
-            continue
-        seen.add(cross_key2)
-
         unique.append(item)
 
     # Cross-store dedup: same product at different stores → merge or keep cheapest
@@ -170,60 +226,45 @@ def _dedup_cross_store(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
     - Same product & same price → merge into one entry with combined store name.
     - Same product & different prices → keep only the cheapest.
     """
-    from collections import defaultdict
-
     MERGEABLE_SOURCES = {"onlinestore", "kassal", "coop"}
 
-    # Separate mergeable and non-mergeable items
-    keep_items: list[dict[str, Any]] = []
-    merge_groups: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    # Group mergeable items by product. Each group's winner replaces the
+    # group's first occurrence; every later occurrence is dropped.
+    merge_groups: dict[str, list[int]] = defaultdict(list)
 
-    for item in items:
-        if item.get("source") not in MERGEABLE_SOURCES:
-            keep_items.append(item)
-        else:
-            pkey = _product_key(item)
-            merge_groups[pkey].append(item)
-
-    # Process each product group
-    deduped: list[dict[str, Any]] = []
-    for pkey, group in merge_groups.items():
-        if len(group) == 1:
-            deduped.append(group[0])
-            continue
+    for i, item in enumerate(items):
+        if item.get("source") in MERGEABLE_SOURCES:
+            merge_groups[_product_key(item)].append(i)
 
+    result = list(items)
+    to_drop: set[int] = set()
+    for indices in merge_groups.values():
+        if len(indices) == 1:
+            continue
+        to_drop.update(indices[1:])
+        group = [items[i] for i in indices]
+
+        # Effective unit price, looked up once per item. Unpriced items
+        # sort last but compare as 0 (matching the original fallbacks).
+        priced = [
+            (
+                it.get("normalized_unit_price")
+                or it.get("unit_price")
+                or it.get("price")
+                or 0,
+                it,
+            )
+            for it in group
+        ]
         # Sort by unit_price (or price) ascending
-        group.sort(
-            key=lambda x: x.get("normalized_unit_price")
-            or x.get("unit_price")
-            or x.get("price")
-            or float("inf")
-        )
-        best_price = (
-            group[0].get("normalized_unit_price")
-            or group[0].get("unit_price")
-            or group[0].get("price")
-            or 0
-        )
+        priced.sort(key=lambda p: p[0] or float("inf"))
+        best_price = priced[0][0]
 
         # Collect all stores at the best price (within 0.1 tolerance)
-        best_items = [
-            it
-            for it in group
-            if abs(
-                (
-                    it.get("normalized_unit_price")
-                    or it.get("unit_price")
-                    or it.get("price")
-                    or 0
-                )
-                - best_price
-            )
-            < 0.1
-        ]
+        best_items = [it for up, it in priced if abs(up - best_price) < 0.1]
 
         if len(best_items) == 1:
-            deduped.append(best_items[0])
+            winner = best_items[0]
         else:
             # Same price at multiple stores — merge store names
             winner = best_items[0].copy()
@@ -239,36 +280,15 @@ def _dedup_cross_store(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
             if urls:
                 winner["url"] = urls[0]
                 winner["alt_urls"] = urls[1:]
-            deduped.append(winner)
-
-        dropped = len(group) - 1
-        if dropped:
-            logger.debug(
-                "Cross-store dedup: kept %s @ %s (dropped %d)",
-                group[0].get("name"),
-                deduped[-1].get("store"),
-                dropped,
-            )
+        result[indices[0]] = winner
 
-    # Reconstruct list preserving original relative order
-    result: list[dict[str, Any]] = []
-    merge_id_set = {id(it) for grp in merge_groups.values() for it in grp}
-    first_ids = {id(grp[0]) for grp in merge_groups.values()}
-    deduped_iter = iter(deduped)
+        logger.debug(
+            "Cross-store dedup: kept %s @ %s (dropped %d)",
+            priced[0][1].get("name"),
+            winner.get("store"),
+            len(group) - 1,
+        )
 
-    for item in items:
-        if id(item) not in merge_id_set:
-            result.append(item)
-        elif id(item) in first_ids:
-            try:
-                result.append(next(deduped_iter))
-            except StopIteration:
-                pass
-
-    # Append any remaining items not yet placed
-    placed = {id(r) for r in result}
-    for item in deduped:
-        if id(item) not in placed:
-            result.append(item)
-
-    return result
+    if not to_drop:
+        return result
+    return [item for i, item in enumerate(result) if i not in to_drop]
@@ -3,19 +3,21 @@
 from __future__ import annotations
 
 import asyncio
-import copy
+import hashlib
 import json
 import logging
+import math
 import sys
 from typing import Any
 
 from src.config import DATA_DIR, load_groups, load_store_urls
+from src.constants import UNIT_SHORT
 from src.db import init_db
-from src.etilbudsavis import fetch_holdbart_offers, normalize_offer, search_offers
-from src.filters import deduplicate, filter_items
-from src.onlinestores import scrape_urls
+from src import etilbudsavis
+from src.etilbudsavis import normalize_offer, search_offers
+from src.filters import deduplicate, iter_filtered
 from src.normalizer import enrich_items
-from src.notify import build_email, build_email_html, send_email
+from src.notify import build_email, build_email_html, send_email_async
 from src.ranking import (
     detect_triggers,
     format_leaderboard,
@@ -30,69 +32,89 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Max groups processed at once (each runs its own URL validation)
+_MAX_CONCURRENT_GROUPS = 4
 
-def _content_changed(
+# Holdbart change detection: fingerprint of the last run's email content
+_FINGERPRINT_FILE = "last_run.fingerprint.json"
+
+
+def _content_fingerprint(
     group_data: list[dict[str, Any]],
     triggers: list[dict[str, str]],
     promo_items: list[dict[str, Any]],
-) -> bool:
-    """Check if current content differs from the last run."""
-    preview_path = DATA_DIR / "last_run.json"
-    if not preview_path.exists():
-        return True  # First run, always send
+) -> dict[str, Any]:
+    """Fingerprint what the email shows: #1 item per group, trigger count, promos.
+
+    The #1 unit prices are kept as plain values next to the digest of the
+    rest, so _content_changed() can compare them with a 0.1 kr tolerance.
+    """
+    top_ids: list[Any] = []
+    top_prices: list[float | None] = []
+    for gd in group_data:
+        top = gd.get("top_items")
+        if top:
+            top_ids.append(top[0].get("source_id"))
+            top_prices.append(top[0].get("normalized_unit_price") or 0)
+        else:
+            top_ids.append(None)
+            top_prices.append(None)
+    promo_ids = sorted(str(item.get("source_id")) for item in promo_items)
 
+    h = hashlib.blake2b(digest_size=16, usedforsecurity=False)
+    h.update(json.dumps([top_ids, len(triggers), promo_ids], default=str).encode())
+    return {"digest": h.hexdigest(), "prices": top_prices}
+
+
+def _content_changed(fingerprint: dict[str, Any]) -> bool:
+    """Check if current content differs from the last run."""
     try:
-        with open(preview_path, "r", encoding="utf-8") as f:
-            last_run = json.load(f)
-    except Exception:
-        return True  # Error reading, assume changed
-
-    # Compare #1 item per group (key indicator of change)
-    last_groups = last_run.get("group_data", [])
-    for i, gd in enumerate(group_data):
-        if i >= len(last_groups):
-            return True
-        last_gd = last_groups[i]
-        last_top = last_gd.get("top_items", [])
-        curr_top = gd.get("top_items", [])
+        last = json.loads((DATA_DIR / _FINGERPRINT_FILE).read_bytes())
+    except (OSError, ValueError):
+        return True  # First run or unreadable, assume changed
+
+    if last.get("digest") != fingerprint["digest"]:
+        return True
 
-        if not last_top or not curr_top:
-            if bool(last_top) != bool(curr_top):
+    last_prices = last.get("prices", [])
+    prices = fingerprint["prices"]
+    if len(last_prices) != len(prices):
+        return True
+    for last_up, up in zip(last_prices, prices):
+        if last_up is None or up is None:
+            if (last_up is None) != (up is None):
                 return True
             continue
-
-        # Compare first item details
-        last_item = last_top[0]
-        curr_item = curr_top[0]
-        if (
-            last_item.get("source_id") != curr_item.get("source_id")
-            or abs(
-                (last_item.get("normalized_unit_price") or 0)
-                - (curr_item.get("normalized_unit_price") or 0)
-            )
-            > 0.1
-        ):
+        # Unit prices carry two decimals; rounding the difference keeps
+        # float noise from pushing a 0.10 kr step over the tolerance
+        if round(abs(last_up - up), 2) > 0.1:
             return True
+    return False
 
-    # Compare triggers
-    last_triggers = last_run.get("triggers", [])
-    if len(triggers) != len(last_triggers):
-        return True
 
-    # Compare promo items (by source_id)
-    last_promo_ids = {item.get("source_id") for item in last_run.get("promo_items", [])}
-    curr_promo_ids = {item.get("source_id") for item in promo_items}
-    if last_promo_ids != curr_promo_ids:
-        return True
+def _item_key(item: dict[str, Any]) -> tuple[str, str]:
+    """Identity of an item across the pipeline: (source, source_id)."""
+    return (item.get("source", ""), item.get("source_id", ""))
+
+
+def _group_sort_key(entry: tuple) -> float:
+    """Sort key for group results: the #1 item's normalized unit price."""
+    top_items = entry[2]
+    if top_items:
+        return top_items[0].get("normalized_unit_price", math.inf)
+    return math.inf
 
-    return False
+
+def _promo_sort_key(item: dict[str, Any]) -> float:
+    """Sort key for promo items: unit price, unknown last."""
+    return item.get("unit_price") or math.inf
 
 
 async def fetch_group(
     group: dict[str, Any],
     online_store_cache: list[dict[str, Any]] | None = None,
-    exclude_stores: set[str] | None = None,
-    only_stores: set[str] | None = None,
+    exclude_stores: frozenset[str] = frozenset(),
+    only_stores: frozenset[str] = frozenset(),
     holdbart_cache: list[dict[str, Any]] | None = None,
 ) -> list[dict[str, Any]]:
     """Fetch items from eTilbudsavis and online stores for a single product group.
@@ -100,20 +122,18 @@ async def fetch_group(
     Args:
         group: Group config from groups.yaml.
         online_store_cache: Pre-scraped online store products (shared across groups).
-        exclude_stores: Store names to skip (case-insensitive).
-        only_stores: If set, only include items from these stores (case-insensitive).
+        exclude_stores: Lower-cased store names to skip.
+        only_stores: If non-empty, only include items from these lower-cased stores.
         holdbart_cache: Pre-fetched Holdbart offers (all from catalog).
     """
     all_items: list[dict[str, Any]] = []
-    _exclude = {s.lower() for s in (exclude_stores or set())}
-    _only = {s.lower() for s in (only_stores or set())} if only_stores else None
 
     # --- Holdbart mode: use pre-fetched catalog offers ---
     if holdbart_cache is not None:
         for raw in holdbart_cache:
             normalized = normalize_offer(raw)
             if normalized:
-                all_items.append(copy.deepcopy(normalized))
+                all_items.append(normalized)
     else:
         # --- eTilbudsavis search ---
         search_terms: list[str] = group.get("search_terms", [])
@@ -124,9 +144,9 @@ async def fetch_group(
                     normalized = normalize_offer(raw)
                     if normalized:
                         store_lower = (normalized.get("store") or "").lower()
-                        if store_lower in _exclude:
+                        if store_lower in exclude_stores:
                             continue
-                        if _only and store_lower not in _only:
+                        if only_stores and store_lower not in only_stores:
                             continue
                         all_items.append(normalized)
             except Exception:
@@ -134,8 +154,9 @@ async def fetch_group(
 
     # --- Online Stores (use cached results) ---
     if online_store_cache:
-        # Deep-copy each item so that per-group enrichment doesn't mutate the cache
-        all_items.extend(copy.deepcopy(online_store_cache))
+        # Copy each item so that per-group enrichment doesn't mutate the cache.
+        # Enrichment only sets top-level keys, so a shallow copy is enough.
+        all_items.extend(item.copy() for item in online_store_cache)
 
     logger.info(
         "Group '%s': fetched %d items (etilbudsavis + online stores)",
@@ -149,9 +170,10 @@ async def process_group(
     group: dict[str, Any],
     top_n: int = 5,
     online_store_cache: list[dict[str, Any]] | None = None,
-    exclude_stores: set[str] | None = None,
-    only_stores: set[str] | None = None,
+    exclude_stores: frozenset[str] = frozenset(),
+    only_stores: frozenset[str] = frozenset(),
     holdbart_cache: list[dict[str, Any]] | None = None,
+    kassal_listings: dict[str, asyncio.Future[dict[str, float] | None]] | None = None,
 ) -> tuple[str, list[dict[str, str]], list[dict[str, Any]], list[dict[str, Any]]]:
     """Full pipeline for one group: fetch → filter → normalize → rank → triggers.
 
@@ -166,20 +188,18 @@ async def process_group(
         holdbart_cache=holdbart_cache,
     )
 
-    # 2. Filter (whitelist/blacklist)
-    filtered = filter_items(raw_items, group)
+    # 2. Filter (whitelist/blacklist), streamed straight into
+    # 2b. URL validation (remove items with dead links)
+    filtered = await validate_urls(iter_filtered(raw_items, group), kassal_listings)
     logger.info(
-        "Group '%s': %d → %d after filtering",
+        "Group '%s': %d → %d after filtering and URL validation",
         group["name"],
         len(raw_items),
         len(filtered),
     )
 
-    # 2b. Validate URLs (remove items with dead links)
-    filtered = await validate_urls(filtered)
-    logger.info("Group '%s': %d after URL validation", group["name"], len(filtered))
-
-    # 3. Deduplicate
+    # 3. Deduplicate — after validation, so a dead or excluded listing
+    # can't shadow a live one from another store
     unique = deduplicate(filtered)
     logger.info(
         "Group '%s': %d → %d after dedup", group["name"], len(filtered), len(unique)
@@ -212,11 +232,10 @@ async def process_group(
     )
 
     # 8. Collect items with active promotions (from ALL enriched, not just top)
+    #    Groups can opt out with `collect_promos: false` to skip the scan.
     promo_items: list[dict[str, Any]] = []
-    for item in enriched:
-        promos = item.get("promos", [])
-        if promos:
-            promo_items.append(item)
+    if group.get("collect_promos", True):
+        promo_items = [item for item in enriched if item.get("promos")]
 
     return leaderboard, triggers, top_items, promo_items
 
@@ -229,6 +248,13 @@ async def run(mode: str = "normal") -> None:
               "holdbart" — run only Holdbart; only send email if a Holdbart
                            product is #1 in any category.
     """
+    try:
+        await _run(mode)
+    finally:
+        await etilbudsavis.aclose()
+
+
+async def _run(mode: str) -> None:
     init_db()
 
     config = load_groups()
@@ -237,19 +263,20 @@ async def run(mode: str = "normal") -> None:
     top_n = notify_config.get("top_n", 5)
 
     # Determine store filtering based on mode
-    exclude_stores: set[str] | None = None
-    only_stores: set[str] | None = None
+    # Store filters (lower-cased), built once and shared by every group
+    exclude_stores: frozenset[str] = frozenset()
+    only_stores: frozenset[str] = frozenset()
     if mode == "holdbart":
-        only_stores = {"holdbart"}
+        only_stores = frozenset({"holdbart"})
         logger.info("Holdbart mode: only processing Holdbart offers")
     else:
-        exclude_stores = {"holdbart"}
+        exclude_stores = frozenset({"holdbart"})
         logger.info("Normal mode: excluding Holdbart offers")
 
     all_leaderboards: list[str] = []
     all_triggers: list[dict[str, str]] = []
-    all_promo_items: list[dict[str, Any]] = []
-    seen_promo_ids: set[str] = set()
+    # Promo items by source_id; the first group to report an item keeps it
+    promo_by_id: dict[str, dict[str, Any]] = {}
 
     # Results per group: (leaderboard, triggers, top_items, promos, group)
     group_results: list[
@@ -269,7 +296,7 @@ async def run(mode: str = "normal") -> None:
     if mode == "holdbart":
         # Fetch ALL Holdbart offers from the active catalog
         try:
-            holdbart_cache = await fetch_holdbart_offers()
+            holdbart_cache = await etilbudsavis.fetch_holdbart_offers()
         except Exception:
             logger.exception("Holdbart catalog fetch error")
             holdbart_cache = []
@@ -280,42 +307,56 @@ async def run(mode: str = "normal") -> None:
             all_store_urls.extend(urls)
 
         if all_store_urls:
+            # Pulls in Playwright; only needed outside Holdbart mode
+            from src.onlinestores import scrape_urls
+
             try:
                 online_store_cache = await scrape_urls(all_store_urls)
             except Exception:
                 logger.exception("Online store scraping error")
 
-    for group in groups:
-        logger.info("Processing group: %s", group["name"])
-        group_top_n = group.get("top_n", top_n)
-        leaderboard, triggers, top_items, promo_items = await process_group(
-            group,
-            top_n=group_top_n,
-            online_store_cache=online_store_cache,
-            exclude_stores=exclude_stores,
-            only_stores=only_stores,
-            holdbart_cache=holdbart_cache,
-        )
+    # Process groups concurrently; the caches are only read from here on.
+    # The semaphore keeps the combined URL-validation fan-out bounded, and
+    # kassal.app pages are shared so each product is checked once per run.
+    group_slots = asyncio.Semaphore(_MAX_CONCURRENT_GROUPS)
+    kassal_listings: dict[str, asyncio.Future[dict[str, float] | None]] = {}
+
+    async def _process(group: dict[str, Any]):
+        async with group_slots:
+            logger.info("Processing group: %s", group["name"])
+            return await process_group(
+                group,
+                top_n=group.get("top_n", top_n),
+                online_store_cache=online_store_cache,
+                exclude_stores=exclude_stores,
+                only_stores=only_stores,
+                holdbart_cache=holdbart_cache,
+                kassal_listings=kassal_listings,
+            )
+
+    results = await asyncio.gather(
+        *(_process(group) for group in groups), return_exceptions=True
+    )
+
+    for group, result in zip(groups, results):
+        if isinstance(result, BaseException):
+            logger.error("Group '%s' failed", group["name"], exc_info=result)
+            continue
+        leaderboard, triggers, top_items, promo_items = result
         group_results.append((leaderboard, triggers, top_items, promo_items, group))
         all_triggers.extend(triggers)
         for item in promo_items:
             sid = item.get("source_id", "")
-            if sid and sid not in seen_promo_ids:
-                seen_promo_ids.add(sid)
-                all_promo_items.append(item)
+            if sid:
+                promo_by_id.setdefault(sid, item)
 
     # Sort groups by cheapest #1 unit price (ascending)
-    def _group_sort_key(entry: tuple) -> float:
-        _lb, _trigs, top_items, _promos, _grp = entry
-        if top_items:
-            return top_items[0].get("normalized_unit_price", float("inf"))
-        return float("inf")
-
     group_results.sort(key=_group_sort_key)
 
     # Build group_data for the HTML email
     group_data: list[dict[str, Any]] = []
-    leaderboard_item_keys: set[str] = set()  # track items shown in leaderboards
+    # (source, source_id) of items shown in leaderboards
+    leaderboard_item_keys: set[tuple[str, str]] = set()
     for lb, _trigs, top, _promos, grp in group_results:
         all_leaderboards.append(lb)
         group_data.append(
@@ -326,16 +367,13 @@ async def run(mode: str = "normal") -> None:
         )
         # Collect keys for all items that appear in a leaderboard table
         for item in top:
-            leaderboard_item_keys.add(
-                f"{item.get('source', '')}:{item.get('source_id', '')}"
-            )
+            leaderboard_item_keys.add(_item_key(item))
 
     # Filter promo items: remove anything already shown in a leaderboard
     unique_promo_items = [
         item
-        for item in all_promo_items
-        if f"{item.get('source', '')}:{item.get('source_id', '')}"
-        not in leaderboard_item_keys
+        for item in promo_by_id.values()
+        if _item_key(item) not in leaderboard_item_keys
     ]
 
     # Print summary to console
@@ -354,24 +392,22 @@ async def run(mode: str = "normal") -> None:
     if unique_promo_items:
         print("\n🏷️  Spesialtilbud:")
         # Sort by unit_price (cheapest first)
-        sorted_promos = sorted(
-            unique_promo_items,
-            key=lambda x: x.get("unit_price") or float("inf"),
-        )
+        sorted_promos = sorted(unique_promo_items, key=_promo_sort_key)
+        lines: list[str] = []
         for item in sorted_promos:
-            promos = item.get("promos", [])
-            promo_str = " | ".join(promos)
+            promo_str = " | ".join(item.get("promos") or ())
             up = item.get("unit_price")
             bu = item.get("base_unit", "")
-            bu_short = {"kilogram": "kg", "liter": "l", "piece": "stk"}.get(bu, bu)
+            up_str = f"{up:.2f} kr/{UNIT_SHORT.get(bu, bu)}" if up else "?"
             price = item.get("price", 0)
             store = item.get("store", "?")
             url = item.get("url", "")
-            up_str = f"{up:.2f} kr/{bu_short}" if up else "?"
-            print(
+            url_suffix = f" → {url}" if url else ""
+            lines.append(
                 f"  • [{promo_str}] {item['name']} — {up_str} ({price:.2f} kr)"
-                f" @ {store}" + (f" → {url}" if url else "")
+                f" @ {store}{url_suffix}"
             )
+        print("\n".join(lines))
 
     print("=" * 60 + "\n")
 
@@ -384,7 +420,7 @@ async def run(mode: str = "normal") -> None:
                 holdbart_best.append(
                     f"  • {gd['display_name']}: {items[0]['name']} "
                     f"@ {items[0].get('normalized_unit_price', 0):.2f} "
-                    f"kr/{_UNIT_SHORT.get(items[0].get('target_unit', ''), '?')}"
+                    f"kr/{UNIT_SHORT.get(items[0].get('target_unit', ''), '?')}"
                 )
         if not holdbart_best:
             logger.info("Holdbart mode: no Holdbart product is #1 — skipping email")
@@ -406,21 +442,22 @@ async def run(mode: str = "normal") -> None:
     _, body_html = build_email_html(group_data, all_triggers, unique_promo_items)
 
     # Check if content has changed (only for Holdbart mode - normal etilbudsavis always sends)
+    fingerprint = _content_fingerprint(group_data, all_triggers, unique_promo_items)
     should_send = True
     if mode == "holdbart":
-        should_send = _content_changed(group_data, all_triggers, unique_promo_items)
+        should_send = _content_changed(fingerprint)
         if not should_send:
             logger.info("Holdbart: content unchanged — skipping email")
             print(
                 "✅ Holdbart-innhold uendret siden forrige kjøring — e-post ikke sendt."
             )
 
-    if should_send:
-        send_email(subject, body, body_html)
-        if all_triggers:
-            logger.info("Email sent with %d triggers", len(all_triggers))
-        else:
-            logger.info("Email sent (no price changes detected)")
+    # SMTP runs in a worker thread while the preview files are written
+    send_task = (
+        asyncio.create_task(send_email_async(subject, body, body_html))
+        if should_send
+        else None
+    )
 
     # Save raw data for quick email preview (preview_email.py)
     preview_data = {
@@ -429,10 +466,21 @@ async def run(mode: str = "normal") -> None:
         "promo_items": unique_promo_items,
     }
     preview_path = DATA_DIR / "last_run.json"
-    with open(preview_path, "w", encoding="utf-8") as f:
-        json.dump(preview_data, f, ensure_ascii=False, default=str)
+    # json.dumps takes the C encoder fast path; json.dump streams chunks
+    # through the pure-Python one.
+    preview_path.write_text(
+        json.dumps(preview_data, ensure_ascii=False, default=str), encoding="utf-8"
+    )
+    (DATA_DIR / _FINGERPRINT_FILE).write_text(json.dumps(fingerprint))
     logger.info("Saved preview data to %s", preview_path)
 
+    if send_task is not None:
+        await send_task
+        if all_triggers:
+            logger.info("Email sent with %d triggers", len(all_triggers))
+        else:
+            logger.info("Email sent (no price changes detected)")
+
 
 def main() -> None:
     mode = "holdbart" if "--holdbart" in sys.argv else "normal"
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import logging
+from functools import lru_cache
 from typing import Any
 
 logger = logging.getLogger(__name__)
@@ -25,19 +26,37 @@ VOLUME_TO_L: dict[str, float] = {
     "ml": 0.001,
 }
 
+PIECE_UNITS: frozenset[str] = frozenset(
+    {"stk", "pcs", "piece", "pieces", "pk", "pakke"}
+)
 
+# Every known raw unit spelling → canonical unit, so mapping is one dict lookup
+UNIT_MAP: dict[str, str] = {
+    **dict.fromkeys(WEIGHT_TO_KG, "kilogram"),
+    **dict.fromkeys(VOLUME_TO_L, "liter"),
+    **dict.fromkeys(PIECE_UNITS, "piece"),
+}
+
+# Target unit → conversion table for weight/volume-based prices
+_TO_TARGET: dict[str, dict[str, float]] = {
+    "kilogram": WEIGHT_TO_KG,
+    "liter": VOLUME_TO_L,
+}
+
+
+@lru_cache(maxsize=64)
+def _unit_key(raw: str) -> str:
+    """Lower-case and strip a raw unit string ("Stk." → "stk")."""
+    return raw.lower().strip().rstrip(".")
+
+
+@lru_cache(maxsize=64)
 def _canon_unit(raw: str | None) -> str | None:
     """Map raw unit to canonical form."""
     if not raw:
         return None
-    r = raw.lower().strip().rstrip(".")
-    if r in WEIGHT_TO_KG:
-        return "kilogram"
-    if r in VOLUME_TO_L:
-        return "liter"
-    if r in ("stk", "stk.", "pcs", "piece", "pieces", "pk", "pakke"):
-        return "piece"
-    return r
+    r = _unit_key(raw)
+    return UNIT_MAP.get(r, r)
 
 
 def compute_unit_price(item: dict[str, Any], target_unit: str) -> float | None:
@@ -48,6 +67,9 @@ def compute_unit_price(item: dict[str, Any], target_unit: str) -> float | None:
       2. Else try to derive from price + weight/weight_unit.
       3. For piece-based: price / pack_size.
 
+    Numeric fields (price, weight, pack_size, unit_price) must already be
+    int/float; every source coerces them when building its items.
+
     Returns kr per target_unit, or None if impossible to compute.
     """
     existing_up = item.get("unit_price")
@@ -55,41 +77,33 @@ def compute_unit_price(item: dict[str, Any], target_unit: str) -> float | None:
 
     # 1) Existing unit_price already in target unit → use directly
     if existing_up is not None and existing_bu == target_unit:
-        return float(existing_up)
+        return existing_up
 
     price = item.get("price")
     if price is None:
         return None
-    price = float(price)
 
     # 2) Derive from weight info (kg/l-based targets)
+    factors = _TO_TARGET.get(target_unit)
     weight = item.get("weight")
     weight_unit = item.get("weight_unit")
-    if weight and weight_unit:
-        weight = float(weight)
-        wu = weight_unit.lower().strip().rstrip(".")
-
-        if target_unit == "kilogram" and wu in WEIGHT_TO_KG:
-            kg = weight * WEIGHT_TO_KG[wu]
-            if kg > 0:
-                return price / kg
-
-        if target_unit == "liter" and wu in VOLUME_TO_L:
-            litres = weight * VOLUME_TO_L[wu]
-            if litres > 0:
-                return price / litres
+    if factors and weight and weight_unit:
+        factor = factors.get(_unit_key(weight_unit))
+        if factor:
+            amount = weight * factor
+            if amount > 0:
+                return price / amount
 
     # 3) Piece-based
     if target_unit == "piece":
         pack_size = item.get("pack_size")
-        if pack_size and float(pack_size) > 0:
-            return price / float(pack_size)
+        if pack_size and pack_size > 0:
+            return price / pack_size
         # If no pack_size, assume 1 piece
         return price
 
     # 4) Existing unit_price with convertible base_unit
     if existing_up is not None and existing_bu:
-        existing_up = float(existing_up)
         # Try converting between compatible units
         if target_unit == "kilogram" and existing_bu == "kilogram":
             return existing_up
@@ -107,7 +121,7 @@ def compute_unit_price(item: dict[str, Any], target_unit: str) -> float | None:
             item.get("name"),
             target_unit,
         )
-        return float(existing_up)
+        return existing_up
 
     logger.debug(
         "Cannot compute unit price for '%s' (price=%.2f, target=%s)",
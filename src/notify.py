@@ -9,10 +9,15 @@ Builds a rich HTML digest email with:
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
+import ssl
+from email import policy
+from email.message import EmailMessage
+from functools import lru_cache
+from html import escape
+from operator import itemgetter
 from typing import Any
 
 from src.config import EMAIL_TO, SMTP_HOST, SMTP_PASSWORD, SMTP_PORT, SMTP_USER
@@ -20,6 +25,10 @@ from src.constants import UNIT_SHORT
 
 logger = logging.getLogger(__name__)
 
+# Escape scraped text before it goes into the HTML body. Store names and
+# promo labels repeat across every table, so the results are cached.
+_esc = lru_cache(maxsize=4096)(escape)
+
 # ---------------------------------------------------------------------------
 # Unit label helpers
 # ---------------------------------------------------------------------------
@@ -81,13 +90,138 @@ _WARN_BG = "#fff8e1"
 _WARN_BORDER = "#ffca28"
 
 
-def _css_reset() -> str:
-    """Email-client-safe wrapper styles."""
-    return (
-        f"<div style=\"font-family:'Segoe UI',Roboto,Helvetica,Arial,sans-serif;"
-        f"width:100%;max-width:900px;margin:0 auto;padding:0;"
-        f'background:{_BG};color:{_TEXT}">'
-    )
+# Static parts of the document, formatted once at import. Only the
+# per-item fragments are built when an email is rendered.
+_DOC_OPEN = (
+    '<!DOCTYPE html><html><head><meta charset="utf-8">'
+    '<meta name="viewport" content="width=device-width,initial-scale=1">'
+    '</head><body style="margin:0;padding:0">'
+    # Email-client-safe wrapper styles
+    f"<div style=\"font-family:'Segoe UI',Roboto,Helvetica,Arial,sans-serif;"
+    f"width:100%;max-width:900px;margin:0 auto;padding:0;"
+    f'background:{_BG};color:{_TEXT}">'
+)
+
+_HERO_OPEN = (
+    f'<div style="background:{_ACCENT};padding:24px 2px 8px;'
+    f'border-radius:0 0 12px 12px">'
+    f'<h1 style="color:#fff;margin:0 0 4px;font-size:22px;text-align:center">'
+    f"🛒 Matpris-oppdatering</h1>"
+    f'<p style="color:rgba(255,255,255,0.8);margin:0 0 16px;font-size:13px;text-align:center">'
+    f"Beste pris per kategori</p>"
+)
+
+_OVERVIEW_HEADER = (
+    f'<div style="margin:16px 8px 8px">'
+    f'<h2 style="font-size:17px;margin:0;color:{_TEXT}">'
+    f"📊 Full oversikt per kategori</h2></div>"
+)
+
+_PROMO_OPEN = (
+    f'<div style="margin:16px">'
+    f'<h2 style="font-size:17px;margin:0 0 8px">🏷️ Spesialtilbud</h2>'
+    f'<table style="width:100%;border-collapse:collapse;font-size:13px;'
+    f'border:1px solid {_BORDER};border-radius:6px;overflow:hidden">'
+    f'<tr style="background:{_ACCENT_LIGHT}">'
+    f'<th style="padding:6px;text-align:left;border-bottom:1px solid {_BORDER}">Tilbud</th>'
+    f'<th style="padding:6px;text-align:left;border-bottom:1px solid {_BORDER}">Produkt</th>'
+    f'<th style="padding:6px;text-align:right;border-bottom:1px solid {_BORDER}">Enhetspris</th>'
+    f'<th style="padding:6px;text-align:right;border-bottom:1px solid {_BORDER}">Pris</th>'
+    f'<th style="padding:6px;text-align:left;border-bottom:1px solid {_BORDER}">Butikk</th>'
+    f"</tr>"
+)
+
+# Leaderboard table pieces that do not depend on the row
+_LB_TABLE_OPEN = (
+    f'<table style="width:100%;min-width:500px;border-collapse:collapse;font-size:12px;'
+    f'border:1px solid {_BORDER};border-radius:6px;overflow:hidden">'
+    f'<tr style="background:{_ACCENT_LIGHT}">'
+    f'<th style="padding:4px;text-align:left;border-bottom:1px solid {_BORDER};font-size:11px">#</th>'
+    f'<th style="padding:4px;text-align:left;border-bottom:1px solid {_BORDER}"></th>'
+    f'<th style="padding:4px;text-align:left;border-bottom:1px solid {_BORDER};font-size:11px">Produkt</th>'
+    f'<th style="padding:4px;text-align:right;border-bottom:1px solid {_BORDER};font-size:11px">Enhetspris</th>'
+    f'<th style="padding:4px;text-align:right;border-bottom:1px solid {_BORDER};font-size:11px">Pris</th>'
+    f'<th style="padding:4px;text-align:left;border-bottom:1px solid {_BORDER};font-size:11px">Butikk</th>'
+    f"</tr>"
+)
+_LB_ROW_BEST = (
+    f'<tr style="background:{_ACCENT_LIGHT};border-bottom:1px solid {_BORDER}">'
+)
+_LB_ROW_ODD = f'<tr style="background:{_CARD_BG};border-bottom:1px solid {_BORDER}">'
+_LB_ROW_EVEN = f'<tr style="background:#f9fafb;border-bottom:1px solid {_BORDER}">'
+_LB_TD_RANK = (
+    f'<td style="padding:3px 4px;text-align:center;color:{_TEXT_MUTED};font-size:11px">'
+)
+_LB_TD_IMG = '<td style="padding:3px 4px">'
+_LB_TD_TEXT = '<td style="padding:3px 4px;font-size:11px">'
+_LB_TD_UNIT_PRICE_BEST = (
+    f'<td style="padding:3px 4px;text-align:right;font-weight:700;'
+    f'color:{_ACCENT};font-size:11px">'
+)
+_LB_TD_UNIT_PRICE = (
+    f'<td style="padding:3px 4px;text-align:right;font-weight:600;'
+    f'color:{_TEXT};font-size:11px">'
+)
+_LB_TD_PRICE = '<td style="padding:3px 4px;text-align:right;font-size:11px">'
+_LB_IMG_STYLE = 'style="width:32px;height:32px;object-fit:contain;border-radius:3px"'
+_LB_VALIDITY_OPEN = f'<br><span style="color:{_TEXT_MUTED};font-size:11px">'
+_LB_PROMO_BADGE_OPEN = (
+    '<br><span style="background:#ffecb3;border-radius:3px;'
+    'padding:1px 4px;font-size:10px;font-weight:600">'
+)
+_LINK_STYLE = f'style="color:{_LINK};text-decoration:none"'
+_ALT_LINK_STYLE = f'style="color:{_TEXT_MUTED};text-decoration:none;font-size:11px"'
+
+# Hero card pieces around the per-item image, name and prices
+_HERO_IMG_STYLE = (
+    'style="width:90px;height:90px;object-fit:contain;border-radius:5px;display:block"'
+)
+_HERO_EMOJI_OPEN = (
+    '<div style="font-size:48px;line-height:90px;'
+    'width:90px;height:90px;text-align:center">'
+)
+_HERO_CARD_OPEN = (
+    f'<div style="background:{_CARD_BG};border-radius:6px;'
+    f'padding:4px;box-shadow:0 1px 2px rgba(0,0,0,0.08)">'
+    f'<table cellpadding="0" cellspacing="0" border="0" style="width:100%">'
+    f"<tr>"
+    f'<td style="width:90px;vertical-align:middle;padding-right:6px">'
+)
+_HERO_CARD_NAME_OPEN = (
+    '</td><td style="vertical-align:middle;padding:2px">'
+    '<div style="font-size:11px;font-weight:600;line-height:1.3;'
+    'margin-bottom:3px;word-wrap:break-word">'
+)
+_HERO_CARD_PRICE_OPEN = (
+    f'</div><div style="font-size:8px;color:{_TEXT_MUTED};line-height:1.3">'
+    f'<span style="font-weight:700;color:{_ACCENT}">'
+)
+
+_TRIGGERS_OPEN = (
+    f'<div style="background:{_WARN_BG};border:1px solid {_WARN_BORDER};'
+    f'border-radius:8px;padding:14px 16px;margin:16px">'
+    f'<h3 style="margin:0 0 8px;font-size:15px">🔔 Varsler ('
+)
+_TRIGGERS_TABLE_OPEN = (
+    ')</h3><table style="width:100%;border-collapse:collapse;font-size:13px">'
+)
+# Badge background per trigger type
+_TRIGGER_BADGE_BG = {
+    "new_best": "#c8e6c9",
+    "below_threshold": "#bbdefb",
+    "enters_top_n": "#fff9c4",
+    "price_drop": "#ffccbc",
+}
+
+_PROMO_ROW_ODD = f'<tr style="background:{_CARD_BG};border-bottom:1px solid {_BORDER}">'
+_PROMO_ROW_EVEN = f'<tr style="background:#f9fafb;border-bottom:1px solid {_BORDER}">'
+
+_FOOTER = (
+    f'<div style="text-align:center;padding:16px;color:{_TEXT_MUTED};'
+    f'font-size:11px;border-top:1px solid {_BORDER};margin-top:8px">'
+    f"Generert av food-alert 🛒</div>"
+    f"</div></body></html>"
+)
 
 
 def _hero_section(best_items: list[dict[str, Any]]) -> str:
@@ -97,83 +231,59 @@ def _hero_section(best_items: list[dict[str, Any]]) -> str:
 
     cols = 2  # max columns per row
 
-    html = (
-        f'<div style="background:{_ACCENT};padding:24px 2px 8px;'
-        f'border-radius:0 0 12px 12px">'
-        f'<h1 style="color:#fff;margin:0 0 4px;font-size:22px;text-align:center">'
-        f"🛒 Matpris-oppdatering</h1>"
-        f'<p style="color:rgba(255,255,255,0.8);margin:0 0 16px;font-size:13px;text-align:center">'
-        f"Beste pris per kategori</p>"
-    )
+    parts: list[str] = [_HERO_OPEN]
 
     # Build card HTML for each item
     cards: list[str] = []
     for item in best_items:
         unit = _unit_label(item)
-        display_name = item.get("_group_display", "")
-        img_url = item.get("image", "")
+        display_name = _esc(item.get("_group_display") or "")
+        img_url = _esc(item.get("image") or "")
         price = item.get("price", 0)
         unit_price = item.get("normalized_unit_price", 0)
-        store = item.get("store", "?")
-        name = item.get("name", "")
-        url = item.get("url", "")
+        store = _esc(item.get("store") or "?")
+        name = _esc(item.get("name") or "")
+        url = _esc(item.get("url") or "")
 
         img_html = ""
         if img_url:
-            img_html = (
-                f'<img src="{img_url}" alt="" '
-                f'style="width:90px;height:90px;object-fit:contain;'
-                f'border-radius:5px;display:block">'
-            )
+            img_html = f'<img src="{img_url}" alt="" {_HERO_IMG_STYLE}>'
         else:
             emoji = display_name.split(" ")[0] if display_name else "🛒"
-            img_html = (
-                f'<div style="font-size:48px;line-height:90px;'
-                f'width:90px;height:90px;text-align:center">{emoji}</div>'
-            )
+            img_html = f"{_HERO_EMOJI_OPEN}{emoji}</div>"
 
         name_linked = name
         if url:
-            name_linked = (
-                f'<a href="{url}" style="color:{_LINK};text-decoration:none">'
-                f"{name}</a>"
-            )
+            name_linked = f'<a href="{url}" {_LINK_STYLE}>{name}</a>'
 
         card = (
-            f'<div style="background:{_CARD_BG};border-radius:6px;'
-            f'padding:4px;box-shadow:0 1px 2px rgba(0,0,0,0.08)">'
-            f'<table cellpadding="0" cellspacing="0" border="0" style="width:100%">'
-            f"<tr>"
-            f'<td style="width:90px;vertical-align:middle;padding-right:6px">{img_html}</td>'
-            f'<td style="vertical-align:middle;padding:2px">'
-            f'<div style="font-size:11px;font-weight:600;line-height:1.3;'
-            f'margin-bottom:3px;word-wrap:break-word">{name_linked}</div>'
-            f'<div style="font-size:8px;color:{_TEXT_MUTED};line-height:1.3">'
-            f'<span style="font-weight:700;color:{_ACCENT}">{unit_price:.2f} {unit}</span>'
+            f"{_HERO_CARD_OPEN}{img_html}"
+            f"{_HERO_CARD_NAME_OPEN}{name_linked}"
+            f"{_HERO_CARD_PRICE_OPEN}{unit_price:.2f} {unit}</span>"
             f" · {price:.2f} kr @ {store}</div>"
             f"</td></tr></table></div>"
         )
         cards.append(card)
 
     # Render as <table> rows of 3 columns (email-client safe)
-    html += (
+    parts.append(
         '<table cellpadding="0" cellspacing="0" border="0" '
         'style="width:100%;margin:0 auto;padding-bottom:8px">'
     )
     for row_start in range(0, len(cards), cols):
         row_cards = cards[row_start : row_start + cols]
-        html += "<tr>"
+        parts.append("<tr>")
         for card in row_cards:
-            html += (
+            parts.append(
                 f'<td style="width:{100 // cols}%;padding:3px;'
                 f'vertical-align:top">{card}</td>'
             )
         # Fill remaining cells if row is incomplete
         for _ in range(cols - len(row_cards)):
-            html += f'<td style="width:{100 // cols}%;padding:3px"></td>'
-        html += "</tr>"
-    html += "</table></div>"
-    return html
+            parts.append(f'<td style="width:{100 // cols}%;padding:3px"></td>')
+        parts.append("</tr>")
+    parts.append("</table></div>")
+    return "".join(parts)
 
 
 def _triggers_section(triggers: list[dict[str, str]]) -> str:
@@ -181,30 +291,20 @@ def _triggers_section(triggers: list[dict[str, str]]) -> str:
     if not triggers:
         return ""
 
-    html = (
-        f'<div style="background:{_WARN_BG};border:1px solid {_WARN_BORDER};'
-        f'border-radius:8px;padding:14px 16px;margin:16px">'
-        f'<h3 style="margin:0 0 8px;font-size:15px">🔔 Varsler ({len(triggers)})</h3>'
-        f'<table style="width:100%;border-collapse:collapse;font-size:13px">'
-    )
+    parts: list[str] = [f"{_TRIGGERS_OPEN}{len(triggers)}{_TRIGGERS_TABLE_OPEN}"]
     for t in triggers:
-        badge_bg = {
-            "new_best": "#c8e6c9",
-            "below_threshold": "#bbdefb",
-            "enters_top_n": "#fff9c4",
-            "price_drop": "#ffccbc",
-        }.get(t["type"], "#e0e0e0")
-
-        html += (
+        badge_bg = _TRIGGER_BADGE_BG.get(t["type"], "#e0e0e0")
+
+        parts.append(
             f"<tr>"
             f'<td style="padding:3px 6px 3px 0;vertical-align:top;white-space:nowrap">'
             f'<span style="background:{badge_bg};border-radius:4px;'
-            f'padding:1px 6px;font-size:11px;font-weight:600">{t["type"]}</span></td>'
-            f'<td style="padding:3px 0">{t["message"]}</td>'
+            f'padding:1px 6px;font-size:11px;font-weight:600">{_esc(t["type"])}</span></td>'
+            f'<td style="padding:3px 0">{_esc(t["message"])}</td>'
             f"</tr>"
         )
-    html += "</table></div>"
-    return html
+    parts.append("</table></div>")
+    return "".join(parts)
 
 
 def _leaderboard_table(
@@ -212,6 +312,7 @@ def _leaderboard_table(
     items: list[dict[str, Any]],
 ) -> str:
     """One category leaderboard as an HTML table."""
+    display_name = _esc(display_name)
     if not items:
         return (
             f'<div style="margin:0 8px 12px">'
@@ -222,85 +323,62 @@ def _leaderboard_table(
 
     unit = _unit_label(items[0])
 
-    html = (
+    parts: list[str] = [
         f'<div style="margin:0 8px 12px;overflow-x:auto">'
         f'<h3 style="margin:0 0 6px;font-size:15px">{display_name}'
         f'<span style="font-weight:400;color:{_TEXT_MUTED};font-size:12px">'
-        f" — sortert etter {unit}</span></h3>"
-        f'<table style="width:100%;min-width:500px;border-collapse:collapse;font-size:12px;'
-        f'border:1px solid {_BORDER};border-radius:6px;overflow:hidden">'
-        f'<tr style="background:{_ACCENT_LIGHT}">'
-        f'<th style="padding:4px;text-align:left;border-bottom:1px solid {_BORDER};font-size:11px">#</th>'
-        f'<th style="padding:4px;text-align:left;border-bottom:1px solid {_BORDER}"></th>'
-        f'<th style="padding:4px;text-align:left;border-bottom:1px solid {_BORDER};font-size:11px">Produkt</th>'
-        f'<th style="padding:4px;text-align:right;border-bottom:1px solid {_BORDER};font-size:11px">Enhetspris</th>'
-        f'<th style="padding:4px;text-align:right;border-bottom:1px solid {_BORDER};font-size:11px">Pris</th>'
-        f'<th style="padding:4px;text-align:left;border-bottom:1px solid {_BORDER};font-size:11px">Butikk</th>'
-        f"</tr>"
-    )
+        f" — sortert etter {unit}</span></h3>",
+        _LB_TABLE_OPEN,
+    ]
 
     for i, item in enumerate(items, 1):
-        bg = _CARD_BG if i % 2 == 1 else "#f9fafb"
-        # Highlight #1
         if i == 1:
-            bg = _ACCENT_LIGHT
+            # Highlight #1 and bold the best price
+            row_open, td_unit_price = _LB_ROW_BEST, _LB_TD_UNIT_PRICE_BEST
+        else:
+            row_open = _LB_ROW_ODD if i % 2 == 1 else _LB_ROW_EVEN
+            td_unit_price = _LB_TD_UNIT_PRICE
 
         img_html = ""
         if item.get("image"):
-            img_html = (
-                f'<img src="{item["image"]}" alt="" '
-                f'style="width:32px;height:32px;object-fit:contain;border-radius:3px">'
-            )
+            img_html = f'<img src="{_esc(item["image"])}" alt="" {_LB_IMG_STYLE}>'
 
-        name = item["name"]
+        name = _esc(item.get("name") or "")
         if item.get("url"):
-            name = f'<a href="{item["url"]}" style="color:{_LINK};text-decoration:none">{name}</a>'
+            name = f'<a href="{_esc(item["url"])}" {_LINK_STYLE}>{name}</a>'
 
-        alt_links = ""
-        for alt_url in item.get("alt_urls", []):
-            alt_links += (
-                f' · <a href="{alt_url}" style="color:{_TEXT_MUTED};'
-                f'text-decoration:none;font-size:11px">🔗</a>'
-            )
+        alt_links = "".join(
+            f' · <a href="{_esc(alt_url)}" {_ALT_LINK_STYLE}>🔗</a>'
+            for alt_url in item.get("alt_urls", [])
+        )
 
         validity = ""
         if item.get("valid_until"):
-            validity = (
-                f'<br><span style="color:{_TEXT_MUTED};font-size:11px">'
-                f'Til {item["valid_until"][:10]}</span>'
-            )
+            validity = f'{_LB_VALIDITY_OPEN}Til {_esc(item["valid_until"][:10])}</span>'
 
         promos = item.get("promos", [])
         promo_badge = ""
         if promos:
-            promo_badge = (
-                f'<br><span style="background:#ffecb3;border-radius:3px;'
-                f'padding:1px 4px;font-size:10px;font-weight:600">'
-                f"🏷️ {promos[0]}</span>"
-            )
+            promo_badge = f"{_LB_PROMO_BADGE_OPEN}🏷️ {_esc(promos[0])}</span>"
 
         source_tag = "📰" if item.get("source") == "etilbudsavis" else "🛒"
         unit_price = item.get("normalized_unit_price", 0)
         price = item.get("price", 0)
-        store = item.get("store", "?")
-
-        # Bold the best price
-        price_weight = "700" if i == 1 else "600"
-
-        html += (
-            f'<tr style="background:{bg};border-bottom:1px solid {_BORDER}">'
-            f'<td style="padding:3px 4px;text-align:center;color:{_TEXT_MUTED};font-size:11px">{i}</td>'
-            f'<td style="padding:3px 4px">{img_html}</td>'
-            f'<td style="padding:3px 4px;font-size:11px">{source_tag} {name}{alt_links}{validity}{promo_badge}</td>'
-            f'<td style="padding:3px 4px;text-align:right;font-weight:{price_weight};'
-            f'color:{_ACCENT if i == 1 else _TEXT};font-size:11px">{unit_price:.2f} {unit}</td>'
-            f'<td style="padding:3px 4px;text-align:right;font-size:11px">{price:.2f} kr</td>'
-            f'<td style="padding:3px 4px;font-size:11px">{store}</td>'
+        store = _esc(item.get("store") or "?")
+
+        parts.append(
+            f"{row_open}"
+            f"{_LB_TD_RANK}{i}</td>"
+            f"{_LB_TD_IMG}{img_html}</td>"
+            f"{_LB_TD_TEXT}{source_tag} {name}{alt_links}{validity}{promo_badge}</td>"
+            f"{td_unit_price}{unit_price:.2f} {unit}</td>"
+            f"{_LB_TD_PRICE}{price:.2f} kr</td>"
+            f"{_LB_TD_TEXT}{store}</td>"
             f"</tr>"
         )
 
-    html += "</table></div>"
-    return html
+    parts.append("</table></div>")
+    return "".join(parts)
 
 
 def _promo_section(promo_items: list[dict[str, Any]]) -> str:
@@ -308,44 +386,31 @@ def _promo_section(promo_items: list[dict[str, Any]]) -> str:
     if not promo_items:
         return ""
 
-    sorted_promos = sorted(
-        promo_items,
-        key=lambda x: x.get("unit_price") or float("inf"),
-    )
+    # Cheapest first; items without a unit price keep their order at the end
+    priced = [p for p in promo_items if p.get("unit_price")]
+    unpriced = [p for p in promo_items if not p.get("unit_price")]
+    sorted_promos = sorted(priced, key=itemgetter("unit_price")) + unpriced
 
-    html = (
-        f'<div style="margin:16px">'
-        f'<h2 style="font-size:17px;margin:0 0 8px">🏷️ Spesialtilbud</h2>'
-        f'<table style="width:100%;border-collapse:collapse;font-size:13px;'
-        f'border:1px solid {_BORDER};border-radius:6px;overflow:hidden">'
-        f'<tr style="background:{_ACCENT_LIGHT}">'
-        f'<th style="padding:6px;text-align:left;border-bottom:1px solid {_BORDER}">Tilbud</th>'
-        f'<th style="padding:6px;text-align:left;border-bottom:1px solid {_BORDER}">Produkt</th>'
-        f'<th style="padding:6px;text-align:right;border-bottom:1px solid {_BORDER}">Enhetspris</th>'
-        f'<th style="padding:6px;text-align:right;border-bottom:1px solid {_BORDER}">Pris</th>'
-        f'<th style="padding:6px;text-align:left;border-bottom:1px solid {_BORDER}">Butikk</th>'
-        f"</tr>"
-    )
+    parts: list[str] = [_PROMO_OPEN]
+    unit_short = UNIT_SHORT.get
 
     for i, item in enumerate(sorted_promos, 1):
-        bg = _CARD_BG if i % 2 == 1 else "#f9fafb"
+        row_open = _PROMO_ROW_ODD if i % 2 == 1 else _PROMO_ROW_EVEN
         promos = item.get("promos", [])
-        promo_str = " | ".join(promos)
+        promo_str = " | ".join(map(_esc, promos))
         bu = item.get("base_unit", "")
-        bu_short = _UNIT_SHORT.get(bu, bu)
+        bu_short = unit_short(bu, bu)
         up = item.get("unit_price", 0)
         price = item.get("price", 0)
-        store = item.get("store", "?")
-        name = item.get("name", "")
-        url = item.get("url", "")
+        store = _esc(item.get("store") or "?")
+        name = _esc(item.get("name") or "")
+        url = _esc(item.get("url") or "")
 
         if url:
-            name = (
-                f'<a href="{url}" style="color:{_LINK};text-decoration:none">{name}</a>'
-            )
+            name = f'<a href="{url}" {_LINK_STYLE}>{name}</a>'
 
-        html += (
-            f'<tr style="background:{bg};border-bottom:1px solid {_BORDER}">'
+        parts.append(
+            f"{row_open}"
             f'<td style="padding:6px"><span style="background:#ffecb3;'
             f"border-radius:3px;padding:2px 6px;font-size:11px;"
             f'font-weight:600">{promo_str}</span></td>'
@@ -357,8 +422,8 @@ def _promo_section(promo_items: list[dict[str, Any]]) -> str:
             f"</tr>"
         )
 
-    html += "</table></div>"
-    return html
+    parts.append("</table></div>")
+    return "".join(parts)
 
 
 def build_email_html(
@@ -390,44 +455,27 @@ def build_email_html(
             best_items.append(best)
 
     # Build HTML
-    html = (
-        '<!DOCTYPE html><html><head><meta charset="utf-8">'
-        '<meta name="viewport" content="width=device-width,initial-scale=1">'
-        '</head><body style="margin:0;padding:0">'
-    )
-    html += _css_reset()
-    html += _hero_section(best_items)
-
-    # Section header
-    html += (
-        f'<div style="margin:16px 8px 8px">'
-        f'<h2 style="font-size:17px;margin:0;color:{_TEXT}">'
-        f"📊 Full oversikt per kategori</h2></div>"
-    )
+    parts: list[str] = [_DOC_OPEN, _hero_section(best_items), _OVERVIEW_HEADER]
 
     # Each category table
     for gd in group_data:
-        html += _leaderboard_table(
-            gd["display_name"],
-            gd.get("top_items", []),
+        parts.append(
+            _leaderboard_table(
+                gd["display_name"],
+                gd.get("top_items", []),
+            )
         )
 
     # Promos
     if promo_items:
-        html += _promo_section(promo_items)
+        parts.append(_promo_section(promo_items))
 
     # Varsler (alerts) at the bottom
-    html += _triggers_section(triggers)
-
-    # Footer
-    html += (
-        f'<div style="text-align:center;padding:16px;color:{_TEXT_MUTED};'
-        f'font-size:11px;border-top:1px solid {_BORDER};margin-top:8px">'
-        f"Generert av food-alert 🛒</div>"
-        f"</div></body></html>"
-    )
+    parts.append(_triggers_section(triggers))
 
-    return subject, html
+    parts.append(_FOOTER)
+
+    return subject, "".join(parts)
 
 
 # ---------------------------------------------------------------------------
@@ -435,6 +483,25 @@ def build_email_html(
 # ---------------------------------------------------------------------------
 
 
+def _smtp_connect() -> smtplib.SMTP:
+    """Open a TLS-protected SMTP connection.
+
+    Port 465 speaks TLS from the first byte, which saves the EHLO/STARTTLS
+    round trips; any other port is upgraded with STARTTLS.
+    """
+    if SMTP_PORT == 465:
+        return smtplib.SMTP_SSL(
+            SMTP_HOST, SMTP_PORT, context=ssl.create_default_context()
+        )
+    server = smtplib.SMTP(SMTP_HOST, SMTP_PORT)
+    try:
+        server.starttls()
+    except Exception:
+        server.close()
+        raise
+    return server
+
+
 def send_email(subject: str, body: str, body_html: str | None = None) -> bool:
     """Send an email via SMTP (HTML + plain-text fallback). Returns True on success."""
     if not all([SMTP_USER, SMTP_PASSWORD, EMAIL_TO]):
@@ -445,21 +512,27 @@ def send_email(subject: str, body: str, body_html: str | None = None) -> bool:
         print("--- END PREVIEW ---\n")
         return False
 
-    msg = MIMEMultipart("alternative")
+    msg = EmailMessage(policy=policy.SMTP)
     msg["Subject"] = subject
     msg["From"] = SMTP_USER
     msg["To"] = EMAIL_TO
-    msg.attach(MIMEText(body, "plain", "utf-8"))
+    msg.set_content(body)
     if body_html:
-        msg.attach(MIMEText(body_html, "html", "utf-8"))
+        msg.add_alternative(body_html, subtype="html")
 
     try:
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-            server.starttls()
+        with _smtp_connect() as server:
             server.login(SMTP_USER, SMTP_PASSWORD)
-            server.sendmail(SMTP_USER, EMAIL_TO.split(","), msg.as_string())
+            server.send_message(msg, SMTP_USER, EMAIL_TO.split(","))
         logger.info("Email sent to %s", EMAIL_TO)
         return True
     except Exception:
         logger.exception("Failed to send email")
         return False
+
+
+async def send_email_async(
+    subject: str, body: str, body_html: str | None = None
+) -> bool:
+    """Run :func:`send_email` in a worker thread so the event loop stays free."""
+    return await asyncio.to_thread(send_email, subject, body, body_html)
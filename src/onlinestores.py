@@ -16,8 +16,9 @@ import asyncio
 import logging
 import random
 import re
-from typing import Any
-from urllib.parse import urlparse
+from functools import lru_cache
+from html import unescape
+from typing import Any, Awaitable
 
 import httpx
 from playwright.async_api import async_playwright
@@ -29,6 +30,11 @@ logger = logging.getLogger(__name__)
 DELAY_MIN = 0.5
 DELAY_MAX = 1.5
 TIMEOUT = 30.0
+# Max store pages/API calls in flight at once
+MAX_CONCURRENT_SCRAPES = 10
+# Oda pages open at once in the shared browser, each in its own context
+ODA_CONCURRENCY = 4
+_NGDATA_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=40)
 
 # ============================================================================
 # NGDATA category mapping
@@ -82,16 +88,22 @@ SLUG_MAPS: dict[str, dict[str, str]] = {
     "joker.no": _JOKER_SLUG_MAP,
 }
 
+# Host (without "www." and port) and path of a store URL
+_RE_STORE_URL = re.compile(
+    r"https?://(?:www\.)?([^/:?#]+)[^/?#]*([^?#]*)", re.IGNORECASE
+)
 
+
+@lru_cache(maxsize=256)
 def _url_to_facet(url: str) -> tuple[str, str, str] | None:
     """Parse a store URL into (domain, store_display_name, facet_string).
 
     Returns None if the URL can't be mapped to a known facet.
     """
-    parsed = urlparse(url)
-    domain = parsed.hostname or ""
-    if domain.startswith("www."):
-        domain = domain[4:]
+    m = _RE_STORE_URL.match(url)
+    if m is None:
+        return None
+    domain = m[1].lower()
 
     if domain not in NGDATA_STORES:
         return None
@@ -99,12 +111,12 @@ def _url_to_facet(url: str) -> tuple[str, str, str] | None:
     slug_map = SLUG_MAPS.get(domain, {})
     store_name = domain.split(".")[0].upper()
 
-    # Extract path segments after /varer/
-    path = parsed.path.rstrip("/")
-    segments = path.split("/")
-
-    # Try slugs from most specific (last) to least specific
-    for seg in reversed(segments):
+    # Try slugs from most specific (last) to least specific. Most URLs
+    # end in a mapped slug, so peel segments off the end one at a time
+    # instead of splitting the whole path.
+    path = m[2].rstrip("/")
+    while path:
+        path, _, seg = path.rpartition("/")
         if seg and seg != "varer":
             facet = slug_map.get(seg)
             if facet:
@@ -117,12 +129,20 @@ def _url_to_facet(url: str) -> tuple[str, str, str] | None:
 # NGDATA API scraper
 # ============================================================================
 
+# Pack size in ngdata's packageSize field, e.g. "12STK"
+_RE_PACK_SIZE = re.compile(r"(\d+)\s*STK", re.IGNORECASE)
+
+# Product image URL = prefix + imagePath + suffix
+_NGDATA_IMAGE_PREFIX = "https://bilder.ngdata.no/"
+_NGDATA_IMAGE_SUFFIX = "/medium.jpg"
+
 
 async def _scrape_ngdata(
     store_id: str,
     product_id: str,
     store_name: str,
     facet: str,
+    client: httpx.AsyncClient,
 ) -> list[dict[str, Any]]:
     """Fetch products from the ngdata API for one category facet."""
     await asyncio.sleep(random.uniform(DELAY_MIN, DELAY_MAX))
@@ -140,94 +160,95 @@ async def _scrape_ngdata(
 
     products: list[dict[str, Any]] = []
 
-    async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-        try:
-            resp = await client.get(url, params=params)
-            resp.raise_for_status()
-            data = resp.json()
-
-            for hit in data.get("hits", {}).get("hits", []):
-                source = hit.get("_source", {})
-
-                title = source.get("title", "")
-                subtitle = source.get("subtitle", "")
-                if title and subtitle:
-                    name = f"{title} - {subtitle}"
-                elif subtitle:
-                    name = subtitle
-                elif title:
-                    name = title
-                else:
-                    name = source.get("brand", "Unknown")
-
-                price = source.get("pricePerUnit")
-                if not price:
-                    continue
-
-                # --- Price correction using comparePricePerUnit ---
-                compare_price = source.get("comparePricePerUnit")
-                compare_unit = (source.get("compareUnit") or "").lower().strip()
-
-                # Weight is always in kg in the API
-                weight_kg = source.get("weight")
-
-                # Pack size from packageSize (e.g. "12STK")
-                pack_size = None
-                pkg_raw = source.get("packageSize", "")
-                pack_match = re.search(r"(\d+)\s*STK", pkg_raw, re.IGNORECASE)
-                if pack_match:
-                    pack_size = int(pack_match.group(1))
-
-                # --- Use comparePricePerUnit for accurate kg pricing ---
-                # The API's pricePerUnit is the total item price, while
-                # comparePricePerUnit is the real per-unit (e.g. per-kg) price.
-                # For ALL items where compareUnit=kg, use comparePricePerUnit
-                # as the authoritative kg price and set weight to 1kg.
-                # This correctly handles:
-                # - "pr Kg" items (e.g. Grillribbe at 205 kr/kg)
-                # - Multi-kg packs (e.g. Ørret hel 3kg at 139 kr/kg)
-                # - Regular weight items (e.g. 500g filet)
-                if compare_price and compare_unit == "kg":
-                    price = float(compare_price)
-                    weight_kg = 1.0
-
-                category = source.get("shoppingListGroupName", "")
-                slug = source.get("slugifiedUrl", "")
-                domain = store_name.lower()
-
-                # Image URL: use imagePath from API directly
-                # e.g. "7035620087509/kmh" → bilder.ngdata.no/7035620087509/kmh/medium.jpg
-                image_path = source.get("imagePath", "")
-                image_url = ""
-                if image_path:
-                    image_url = f"https://bilder.ngdata.no/{image_path}/medium.jpg"
-
-                products.append(
-                    {
-                        "name": name,
-                        "price": float(price),
-                        "weight": float(weight_kg) if weight_kg else None,
-                        "weight_unit": "kg" if weight_kg else None,
-                        "pack_size": pack_size,
-                        "category": category,
-                        "store": store_name,
-                        "source": "onlinestore",
-                        "source_id": f"{domain}_{hit.get('_id', '')}",
-                        "image": image_url,
-                        "url": (
-                            f"https://{domain}.no{slug}"
-                            if slug
-                            else f"https://{domain}.no/varer/{hit.get('_id', '')}"
-                        ),
-                    }
-                )
+    try:
+        resp = await client.get(url, params=params)
+        resp.raise_for_status()
+        data = resp.json()
+
+        # Per-store values, the same for every hit
+        domain = store_name.lower()
+        site = f"https://{domain}.no"
+
+        for hit in data.get("hits", {}).get("hits", []):
+            source = hit.get("_source", {})
+            hit_id = hit.get("_id", "")
+
+            title = source.get("title", "")
+            subtitle = source.get("subtitle", "")
+            if title and subtitle:
+                name = f"{title} - {subtitle}"
+            elif subtitle:
+                name = subtitle
+            elif title:
+                name = title
+            else:
+                name = source.get("brand", "Unknown")
+
+            price = source.get("pricePerUnit")
+            if not price:
+                continue
+
+            # --- Price correction using comparePricePerUnit ---
+            compare_price = source.get("comparePricePerUnit")
+            compare_unit = source.get("compareUnit")
+
+            # Weight is always in kg in the API
+            weight_kg = source.get("weight")
+
+            # Pack size from packageSize (e.g. "12STK")
+            pack_size = None
+            pkg_raw = source.get("packageSize", "")
+            pack_match = _RE_PACK_SIZE.search(pkg_raw)
+            if pack_match:
+                pack_size = int(pack_match.group(1))
+
+            # --- Use comparePricePerUnit for accurate kg pricing ---
+            # The API's pricePerUnit is the total item price, while
+            # comparePricePerUnit is the real per-unit (e.g. per-kg) price.
+            # For ALL items where compareUnit=kg, use comparePricePerUnit
+            # as the authoritative kg price and set weight to 1kg.
+            # This correctly handles:
+            # - "pr Kg" items (e.g. Grillribbe at 205 kr/kg)
+            # - Multi-kg packs (e.g. Ørret hel 3kg at 139 kr/kg)
+            # - Regular weight items (e.g. 500g filet)
+            if compare_price and compare_unit and compare_unit.lower() == "kg":
+                price = float(compare_price)
+                weight_kg = 1.0
+
+            category = source.get("shoppingListGroupName", "")
+            slug = source.get("slugifiedUrl", "")
+
+            # Image URL: use imagePath from API directly
+            # e.g. "7035620087509/kmh" → bilder.ngdata.no/7035620087509/kmh/medium.jpg
+            image_path = source.get("imagePath", "")
+            image_url = (
+                _NGDATA_IMAGE_PREFIX + image_path + _NGDATA_IMAGE_SUFFIX
+                if image_path
+                else ""
+            )
 
-            logger.info(
-                "%s: fetched %d products (facet=%s)", store_name, len(products), facet
+            products.append(
+                {
+                    "name": name,
+                    "price": float(price),
+                    "weight": float(weight_kg) if weight_kg else None,
+                    "weight_unit": "kg" if weight_kg else None,
+                    "pack_size": pack_size,
+                    "category": category,
+                    "store": store_name,
+                    "source": "onlinestore",
+                    "source_id": f"{domain}_{hit_id}",
+                    "image": image_url,
+                    "url": f"{site}{slug}" if slug else f"{site}/varer/{hit_id}",
+                }
             )
 
-        except Exception as e:
-            logger.error("Failed to fetch from %s API: %s", store_name, e)
+        logger.info(
+            "%s: fetched %d products (facet=%s)", store_name, len(products), facet
+        )
+
+    except Exception as e:
+        logger.error("Failed to fetch from %s API: %s", store_name, e)
 
     return products
 
@@ -237,40 +258,96 @@ async def _scrape_ngdata(
 # ============================================================================
 
 _browser = None
+_browser_lock = asyncio.Lock()
+
+# Oda pages are only read for their text and <img src> attributes, so
+# the bytes behind these requests are never needed.
+_ODA_BLOCKED_RESOURCES = frozenset({"image", "media", "font"})
+
+# Article text patterns: price "60,40 kr", unit price "55,93 kr /kg",
+# pack size "18 stk" and net weight "500 g"
+_RE_ODA_PRICE = re.compile(r"(\d+[,\.]\d+)\s*kr")
+_RE_ODA_UNIT_PRICE = re.compile(r"(\d+[,\.]\d+)\s*kr\s*/\s*(\w+)")
+_RE_ODA_PACK_SIZE = re.compile(r"(\d+)\s*stk", re.IGNORECASE)
+_RE_ODA_WEIGHT = re.compile(r"(\d+[,.]?\d*)\s*(kg|g|l|dl|ml)\b", re.IGNORECASE)
+
+# Everything the parser needs from each <article>, read in one round trip
+_ODA_ARTICLES_JS = """
+() => Array.from(document.querySelectorAll("article"), (a) => {
+  const link = a.querySelector('a[href*="/products/"]');
+  return {
+    text: a.innerText,
+    imgs: Array.from(a.querySelectorAll("img"), (i) => i.getAttribute("src") || ""),
+    link: link && {title: link.getAttribute("title") || "", text: link.innerText},
+  };
+})
+"""
 
 
 async def _get_browser():
     """Shared Playwright browser instance."""
     global _browser
-    if _browser is None:
-        pw = await async_playwright().start()
-        _browser = await pw.chromium.launch(headless=True)
+    # Concurrent Oda pages must not each launch a browser
+    async with _browser_lock:
+        if _browser is None:
+            pw = await async_playwright().start()
+            _browser = await pw.chromium.launch(headless=True)
     return _browser
 
 
+# URL keyword → category, checked in order
+_ODA_CATEGORY_KEYWORDS: tuple[tuple[str, str], ...] = (
+    ("egg", "Egg"),
+    ("melk", "Melk"),
+    ("kylling", "Kjøtt"),
+    ("kjott", "Kjøtt"),
+    ("fisk", "Fisk"),
+    ("sjomat", "Fisk"),
+)
+
+
+def _oda_category(url: str) -> str:
+    """Infer the product category of an Oda listing page from its URL."""
+    url_lower = url.lower()
+    return next((cat for kw, cat in _ODA_CATEGORY_KEYWORDS if kw in url_lower), "")
+
+
+async def _block_heavy_resources(route) -> None:
+    """Playwright route handler that drops images, media and fonts."""
+    if route.request.resource_type in _ODA_BLOCKED_RESOURCES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
 async def _scrape_oda_page(url: str) -> list[dict[str, Any]]:
     """Scrape one Oda category page."""
     await asyncio.sleep(random.uniform(DELAY_MIN, DELAY_MAX))
 
     browser = await _get_browser()
-    page = await browser.new_page()
+    context = await browser.new_context()
+    page = await context.new_page()
     products: list[dict[str, Any]] = []
 
     try:
-        await page.goto(url, wait_until="networkidle", timeout=30000)
-        await page.wait_for_timeout(3000)
+        await page.route("**/*", _block_heavy_resources)
+        # Wait for the product cards themselves, not for the network to
+        # go quiet plus a fixed settle delay
+        await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+        await page.wait_for_selector("article", state="attached", timeout=15000)
 
-        articles = await page.query_selector_all("article")
+        articles = await page.evaluate(_ODA_ARTICLES_JS)
+        category = _oda_category(url)
 
         for article in articles:
             try:
-                text = await article.inner_text()
+                text = article["text"]
 
                 if "kr" not in text.lower():
                     continue
 
                 # Price (e.g. "60,40 kr")
-                price_match = re.search(r"(\d+[,\.]\d+)\s*kr", text)
+                price_match = _RE_ODA_PRICE.search(text)
                 if not price_match:
                     continue
                 price = float(price_match.group(1).replace(",", "."))
@@ -289,18 +366,14 @@ async def _scrape_oda_page(url: str) -> list[dict[str, Any]]:
                         break
 
                 if not name:
-                    link = await article.query_selector('a[href*="/products/"]')
+                    link = article["link"]
                     if link:
-                        name = (
-                            await link.get_attribute("title") or await link.inner_text()
-                        )
+                        name = link["title"] or link["text"]
                         name = name.strip().split("\n")[0]
 
                 # Image: first product img (skip certification badges)
                 image_url = ""
-                imgs = await article.query_selector_all("img")
-                for img_el in imgs:
-                    src = await img_el.get_attribute("src") or ""
+                for src in article["imgs"]:
                     if "local_products" in src or "product" in src:
                         image_url = src
                         break
@@ -309,7 +382,7 @@ async def _scrape_oda_page(url: str) -> list[dict[str, Any]]:
                     continue
 
                 # Unit price (e.g. "55,93 kr /kg")
-                unit_price_match = re.search(r"(\d+[,\.]\d+)\s*kr\s*/\s*(\w+)", text)
+                unit_price_match = _RE_ODA_UNIT_PRICE.search(text)
                 unit_price = None
                 base_unit = None
                 if unit_price_match:
@@ -327,28 +400,14 @@ async def _scrape_oda_page(url: str) -> list[dict[str, Any]]:
                 weight_val = None
                 weight_unit = None
                 for line in lines:
-                    stk_match = re.search(r"(\d+)\s*stk", line, re.IGNORECASE)
+                    stk_match = _RE_ODA_PACK_SIZE.search(line)
                     if stk_match and not pack_size:
                         pack_size = int(stk_match.group(1))
-                    wt_match = re.search(
-                        r"(\d+[,.]?\d*)\s*(kg|g|l|dl|ml)\b", line, re.IGNORECASE
-                    )
+                    wt_match = _RE_ODA_WEIGHT.search(line)
                     if wt_match and not weight_val:
                         weight_val = float(wt_match.group(1).replace(",", "."))
                         weight_unit = wt_match.group(2).lower()
 
-                # Infer category from URL
-                category = ""
-                url_lower = url.lower()
-                if "egg" in url_lower:
-                    category = "Egg"
-                elif "melk" in url_lower:
-                    category = "Melk"
-                elif "kylling" in url_lower or "kjott" in url_lower:
-                    category = "Kjøtt"
-                elif "fisk" in url_lower or "sjomat" in url_lower:
-                    category = "Fisk"
-
                 products.append(
                     {
                         "name": name,
@@ -375,7 +434,7 @@ async def _scrape_oda_page(url: str) -> list[dict[str, Any]]:
     except Exception as e:
         logger.error("Failed to scrape Oda (%s): %s", url, e)
     finally:
-        await page.close()
+        await context.close()
 
     return products
 
@@ -397,6 +456,36 @@ COOP_URLS = [
     "https://www.coop.no/Weekly_offers_listing_page?chain=coop-prix",
     "https://www.coop.no/Weekly_offers_listing_page?chain=obs",
 ]
+_COOP_LIMITS = httpx.Limits(max_connections=10, max_keepalive_connections=10)
+
+# Offer page markup patterns; everything after the first is applied to one
+# <article>...</article> block at a time
+_RE_COOP_ARTICLE = re.compile(r"<article\b.*?</article>", re.DOTALL)
+_RE_COOP_NAME = re.compile(
+    r'href="/Weekly_offers_listing_page\?chain=[^&]+&amp;id=(\d+)">([^<]+)</a>'
+)
+_RE_COOP_PERCENT = re.compile(r"-\d+%")
+_RE_COOP_PRICE_DIV = re.compile(r"<div[^>]*>\d{1,4}</div>")
+_RE_COOP_UNIT_PRICE = re.compile(r"Pr (\w+) ([\d,.]+)")
+_RE_COOP_PRICE = re.compile(
+    r"<div[^>]*>(\d{1,4})</div>\s*(?:<style[^>]*>[^<]*</style>\s*)?"
+    r"<div[^>]*>(\d{2})</div>"
+)
+_RE_COOP_SINGLE_PRICE = re.compile(r"<div[^>]*>(\d{1,4})</div>\s*</div>")
+_RE_COOP_N_FOR = re.compile(r"(\d+)\s+for\s+(\d+)")
+_RE_COOP_IMAGE = re.compile(r'src="(https://cdcimg\.coop\.no/[^"]+)"')
+_RE_COOP_WEIGHT = re.compile(r"(\d+(?:[.,]\d+)?)\s*(kg|g|l|dl|ml|cl)\b", re.IGNORECASE)
+
+# "Pr kg" unit → base_unit, and net-weight unit → (factor, kg/l)
+_COOP_BASE_UNITS = {"kg": "kilogram", "l": "liter", "stk": "piece"}
+_COOP_NET_UNITS: dict[str, tuple[float, str]] = {
+    "g": (0.001, "kg"),
+    "kg": (1.0, "kg"),
+    "ml": (0.001, "l"),
+    "cl": (0.01, "l"),
+    "dl": (0.1, "l"),
+    "l": (1.0, "l"),
+}
 
 
 async def _scrape_coop() -> list[dict[str, Any]]:
@@ -405,115 +494,100 @@ async def _scrape_coop() -> list[dict[str, Any]]:
     Parses the HTML from coop.no weekly offers pages, extracting product
     name, unit price, image, and EAN. Skips percentage-only discounts.
     """
-    all_products: list[dict[str, Any]] = []
 
-    async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-        for url in COOP_URLS:
-            chain_param = url.split("chain=")[-1]
-            store_name = COOP_CHAINS.get(chain_param, chain_param)
+    async def fetch_one(url: str) -> list[dict[str, Any]]:
+        chain_param = url.split("chain=")[-1]
+        store_name = COOP_CHAINS.get(chain_param, chain_param)
 
-            try:
-                resp = await client.get(
-                    url,
-                    headers={"User-Agent": "Mozilla/5.0"},
-                    follow_redirects=True,
-                )
-                resp.raise_for_status()
-                products = _parse_coop_html(resp.text, store_name)
-                all_products.extend(products)
-                logger.info("Coop %s: scraped %d products", store_name, len(products))
-            except Exception:
-                logger.exception("Failed to scrape Coop %s", store_name)
+        # Jitter staggers the chains without serializing them
+        await asyncio.sleep(random.uniform(DELAY_MIN, DELAY_MAX))
+        try:
+            resp = await client.get(
+                url,
+                headers={"User-Agent": "Mozilla/5.0"},
+                follow_redirects=True,
+            )
+            resp.raise_for_status()
+            products = _parse_coop_html(resp.text, store_name)
+            logger.info("Coop %s: scraped %d products", store_name, len(products))
+            return products
+        except Exception:
+            logger.exception("Failed to scrape Coop %s", store_name)
+            return []
 
-            await asyncio.sleep(random.uniform(DELAY_MIN, DELAY_MAX))
+    async with httpx.AsyncClient(timeout=TIMEOUT, limits=_COOP_LIMITS) as client:
+        results = await asyncio.gather(*(fetch_one(url) for url in COOP_URLS))
 
-    return all_products
+    return [product for products in results for product in products]
 
 
 def _parse_coop_html(html: str, store_name: str) -> list[dict[str, Any]]:
     """Parse Coop weekly offers HTML into product dicts."""
     products: list[dict[str, Any]] = []
-    articles = re.split(r"<article\b", html)
+    for article_m in _RE_COOP_ARTICLE.finditer(html):
+        article = article_m.group(0)
 
-    for article in articles[1:]:
         # --- Product name & EAN ---
-        name_m = re.search(
-            r'href="/Weekly_offers_listing_page\?chain=[^&]+&amp;id=(\d+)">'
-            r"([^<]+)</a>",
-            article,
-        )
+        name_m = _RE_COOP_NAME.search(article)
         if not name_m:
             continue
+
+        # --- Unit price (most reliable field) ---
+        # Checked before the price markup is parsed, so offers without one
+        # are dropped after a single search.
+        unit_m = _RE_COOP_UNIT_PRICE.search(article)
+        if not unit_m:
+            continue  # No unit price info → skip
+
         ean = name_m.group(1)
         name = name_m.group(2).strip()
         # Decode HTML entities
-        name = name.replace("&amp;", "&").replace("&#x27;", "'")
+        name = unescape(name)
 
         # --- Skip percentage-only discounts ---
         # Check for -NN% pattern in the price section (before h3)
         h3_idx = article.find("<h3")
         price_section = article[:h3_idx] if h3_idx > 0 else ""
-        if re.search(r"-\d+%", price_section) and not re.search(
-            r"<div[^>]*>\d{1,4}</div>", price_section
+        if _RE_COOP_PERCENT.search(price_section) and not _RE_COOP_PRICE_DIV.search(
+            price_section
         ):
             logger.debug("Coop %s: skipping %%-only offer: %s", store_name, name)
             continue
 
-        # --- Unit price (most reliable field) ---
-        unit_m = re.search(r"Pr (\w+) ([\d,.]+)", article)
-        if not unit_m:
-            continue  # No unit price info → skip
         unit_type = unit_m.group(1).lower()  # kg, l, stk, etc.
         unit_price = float(unit_m.group(2).replace(",", "."))
 
         # --- Map unit to base_unit ---
-        unit_map = {"kg": "kilogram", "l": "liter", "stk": "piece"}
-        base_unit = unit_map.get(unit_type, unit_type)
+        base_unit = _COOP_BASE_UNITS.get(unit_type, unit_type)
 
         # --- Actual price from <div>NN</div><div>NN</div> ---
-        price_m = re.search(
-            r"<div[^>]*>(\d{1,4})</div>\s*(?:<style[^>]*>[^<]*</style>\s*)?<div[^>]*>(\d{2})</div>",
-            price_section,
-        )
+        price_m = _RE_COOP_PRICE.search(price_section)
         if not price_m:
             # Try single-number price: <div>NN</div></div>
-            single_m = re.search(r"<div[^>]*>(\d{1,4})</div>\s*</div>", price_section)
+            single_m = _RE_COOP_SINGLE_PRICE.search(price_section)
             price = float(single_m.group(1)) if single_m else None
         else:
             price = float(f"{price_m.group(1)}.{price_m.group(2)}")
 
         # --- Promo detection (N for X) ---
         promos: list[str] = []
-        nfor_m = re.search(r"(\d+)\s+for\s+(\d+)", article)
+        nfor_m = _RE_COOP_N_FOR.search(article)
         if nfor_m:
             promos.append(f"{nfor_m.group(1)} for {nfor_m.group(2)}")
 
         # --- Image ---
-        img_m = re.search(r'src="(https://cdcimg\.coop\.no/[^"]+)"', article)
-        image = img_m.group(1).replace("&amp;", "&") if img_m else ""
+        img_m = _RE_COOP_IMAGE.search(article)
+        image = unescape(img_m.group(1)) if img_m else ""
 
         # --- Weight from name (e.g. "Kyllingfilet 1000g") ---
         weight = None
         weight_unit = None
-        w_m = re.search(r"(\d+(?:[.,]\d+)?)\s*(kg|g|l|dl|ml|cl)\b", name, re.IGNORECASE)
+        w_m = _RE_COOP_WEIGHT.search(name)
         if w_m:
             w_val = float(w_m.group(1).replace(",", "."))
-            w_unit = w_m.group(2).lower()
             # Convert to kg/l
-            w_conversions = {
-                "g": 0.001,
-                "kg": 1,
-                "ml": 0.001,
-                "cl": 0.01,
-                "dl": 0.1,
-                "l": 1,
-            }
-            weight = w_val * w_conversions.get(w_unit, 1)
-            weight_unit = (
-                "kg"
-                if w_unit in ("g", "kg")
-                else "l" if w_unit in ("ml", "cl", "dl", "l") else w_unit
-            )
+            factor, weight_unit = _COOP_NET_UNITS[w_m.group(2).lower()]
+            weight = w_val * factor
 
         # --- Build URL ---
         product_url = (
@@ -543,24 +617,49 @@ def _parse_coop_html(html: str, store_name: str) -> list[dict[str, Any]]:
     return products
 
 
-async def scrape_urls(urls: list[str]) -> list[dict[str, Any]]:
+async def scrape_urls(
+    urls: list[str], concurrency: int = MAX_CONCURRENT_SCRAPES
+) -> list[dict[str, Any]]:
     """Scrape products from online store URLs.
 
     Parses each URL to determine the store and category, then calls
     the appropriate API or scraper.  Deduplicates facets so we don't
     hit the same API endpoint twice.
-    """
-    all_products: list[dict[str, Any]] = []
-    seen_facets: set[str] = set()  # "domain|facet" → avoid duplicates
 
+    URLs are scraped concurrently (at most *concurrency* at a time) and the
+    Coop chains alongside them; products keep the order of *urls*.  Oda
+    pages share one browser, with at most ``ODA_CONCURRENCY`` open at once.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    oda_slot = asyncio.Semaphore(ODA_CONCURRENCY)
+    jobs: list[Awaitable[list[dict[str, Any]]]] = []
+    seen_facets: set[tuple[str, str]] = set()  # (store_id, facet) already queued
+    seen_oda: set[str] = set()  # Oda page URLs already queued
+
+    async def limited(
+        job: Awaitable[list[dict[str, Any]]],
+        slot: asyncio.Semaphore | None = None,
+    ) -> list[dict[str, Any]]:
+        # Take the per-store slot first so queued Oda pages don't hold
+        # general slots while they wait for a browser slot.
+        if slot is not None:
+            async with slot, semaphore:
+                return await job
+        async with semaphore:
+            return await job
+
+    # Work out what to fetch first, keeping URL order:
+    # an Oda page URL, or an ngdata (store_id, product_id, store_name, facet).
+    targets: list[str | tuple[str, str, str, str]] = []
     for url in urls:
-        parsed = urlparse(url)
-        domain = (parsed.hostname or "").lstrip("www.")
+        m = _RE_STORE_URL.match(url)
+        domain = m[1].lower() if m else ""
 
         # --- Oda: DOM scraping ---
         if "oda.com" in domain:
-            prods = await _scrape_oda_page(url)
-            all_products.extend(prods)
+            if url not in seen_oda:
+                seen_oda.add(url)
+                targets.append(url)
             continue
 
         # --- ngdata stores (Meny, Spar, Joker) ---
@@ -570,21 +669,35 @@ async def scrape_urls(urls: list[str]) -> list[dict[str, Any]]:
             continue
 
         domain, store_name, facet = result
-        facet_key = f"{domain}|{facet}"
+        store_id, product_id = NGDATA_STORES[domain]
+        facet_key = (store_id, facet)
         if facet_key in seen_facets:
             continue  # already fetched this category
         seen_facets.add(facet_key)
 
-        store_id, product_id = NGDATA_STORES[domain]
-        prods = await _scrape_ngdata(store_id, product_id, store_name, facet)
-        all_products.extend(prods)
+        targets.append((store_id, product_id, store_name, facet))
 
     # --- Coop chains (Extra, Coop Mega, Coop Prix, Obs) ---
-    try:
-        coop_products = await _scrape_coop()
-        all_products.extend(coop_products)
-    except Exception:
-        logger.exception("Coop scraping error")
+    async def scrape_coop() -> list[dict[str, Any]]:
+        try:
+            return await _scrape_coop()
+        except Exception:
+            logger.exception("Coop scraping error")
+            return []
+
+    # All ngdata facets share one pooled client (keep-alive across calls)
+    async with httpx.AsyncClient(timeout=TIMEOUT, limits=_NGDATA_LIMITS) as client:
+        for target in targets:
+            if isinstance(target, str):
+                jobs.append(limited(_scrape_oda_page(target), oda_slot))
+            else:
+                jobs.append(limited(_scrape_ngdata(*target, client)))
+        jobs.append(scrape_coop())
+        results = await asyncio.gather(*jobs)
+
+    all_products: list[dict[str, Any]] = []
+    for prods in results:
+        all_products.extend(prods)
 
     logger.info("Total online‐store products scraped: %d", len(all_products))
     return all_products
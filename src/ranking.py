@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+import heapq
 import logging
+import math
 from typing import Any
 
 from src.db import (
@@ -23,8 +25,11 @@ UNIT_LABELS = {
 
 def rank(items: list[dict[str, Any]], top_n: int = 5) -> list[dict[str, Any]]:
     """Sort items by normalized_unit_price ascending, return top N."""
-    ranked = sorted(items, key=lambda x: x.get("normalized_unit_price", float("inf")))
-    return ranked[:top_n]
+    # Same result as sorted(...)[:top_n] (ties keep input order) without
+    # sorting the whole list
+    return heapq.nsmallest(
+        top_n, items, key=lambda x: x.get("normalized_unit_price", math.inf)
+    )
 
 
 def detect_triggers(
@@ -74,21 +79,23 @@ def detect_triggers(
 
     # --- below_threshold: only fire once per item (not seen at this price before) ---
     if threshold is not None:
+        # top_items is rank() output, so stop at the first item over threshold
         for item in top_items:
-            if item["normalized_unit_price"] < threshold:
-                triggers.append(
-                    {
-                        "type": "below_threshold",
-                        "group": group_name,
-                        "message": (
-                            f"{group_name} under terskel ({threshold:.0f} {unit_label}): "
-                            f"{item['name']} @ {item['normalized_unit_price']:.2f} {unit_label} "
-                            f"hos {item.get('store', '?')}"
-                        ),
-                        "item": item["name"],
-                        "price": f"{item['normalized_unit_price']:.2f}",
-                    }
-                )
+            if item["normalized_unit_price"] >= threshold:
+                break
+            triggers.append(
+                {
+                    "type": "below_threshold",
+                    "group": group_name,
+                    "message": (
+                        f"{group_name} under terskel ({threshold:.0f} {unit_label}): "
+                        f"{item['name']} @ {item['normalized_unit_price']:.2f} {unit_label} "
+                        f"hos {item.get('store', '?')}"
+                    ),
+                    "item": item["name"],
+                    "price": f"{item['normalized_unit_price']:.2f}",
+                }
+            )
 
     # --- price_drop (>10% vs previous run) ---
     if prev_best_price and current_best_price < prev_best_price * 0.9:
@@ -107,12 +114,12 @@ def detect_triggers(
             }
         )
 
-    # --- enters_top_n ---
-    current_ids = {f"{i['source']}:{i['source_id']}" for i in top_items[:top_n]}
-    new_entries = current_ids - prev_ids
-    for item in top_items[:top_n]:
-        item_key = f"{item['source']}:{item['source_id']}"
-        if item_key in new_entries and prev_ids:
+    # --- enters_top_n (only once there is a previous run to compare with) ---
+    current_top = top_items[:top_n]
+    if prev_ids:
+        for item in current_top:
+            if f"{item['source']}:{item['source_id']}" in prev_ids:
+                continue
             triggers.append(
                 {
                     "type": "enters_top_n",
@@ -134,7 +141,7 @@ def detect_triggers(
         best_item=current_best["name"],
         best_store=current_best.get("store"),
         unit_label=unit_label,
-        top_items=top_items[:top_n],
+        top_items=current_top,
     )
 
     return triggers
@@ -160,9 +167,9 @@ def format_leaderboard(
         link = ""
         if item.get("url"):
             link = f" → {item['url']}"
-        alt_links = ""
-        for alt_url in item.get("alt_urls", []):
-            alt_links += f"\n       → {alt_url}"
+        alt_links = "".join(
+            f"\n       → {alt_url}" for alt_url in item.get("alt_urls", [])
+        )
         lines.append(
             f"  {i}. {source_tag} {item['name']} — "
             f"{item['normalized_unit_price']:.2f} {unit_label} "
@@ -8,52 +8,97 @@ Also cross-checks API prices against kassal.app website prices for accuracy.
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import re
+from functools import lru_cache
 from urllib.parse import quote_plus
-from typing import Any
+from typing import Any, Iterable
 
 import httpx
 
-from src.constants import EXCLUDED_KASSAL_STORES, STORE_SEARCH_URLS
+from src.constants import EXCLUDED_KASSAL_STORES_RE, STORE_SEARCH_URLS
 
 logger = logging.getLogger(__name__)
 
 # Max concurrent URL checks
 _MAX_CONCURRENT = 15
 _TIMEOUT = 10
+_LIMITS = httpx.Limits(
+    max_connections=_MAX_CONCURRENT, max_keepalive_connections=_MAX_CONCURRENT
+)
+
+# Regex: store logo alt text + price from the same listing block
+_STORE_PRICE_RE = re.compile(
+    r'alt="([^"]+)"[^>]*class="h-10 w-10".*?'
+    r"text-(?:green|rose)-600[^>]*>\s*kr\s*([\d.,]+)",
+    re.DOTALL,
+)
+
+# Any known store key inside a (lowercased) store name, e.g. "meny storo"
+_STORE_KEY_RE = re.compile("|".join(map(re.escape, STORE_SEARCH_URLS)))
 
 
 def _is_excluded_store(item: dict[str, Any]) -> bool:
     """Check if the item's store is excluded from kassal results."""
-    store = (item.get("store") or "").lower().strip()
-    return any(store == excl or excl in store for excl in EXCLUDED_KASSAL_STORES)
+    store = item.get("store")
+    return bool(store and EXCLUDED_KASSAL_STORES_RE.search(store))
 
 
 def _build_search_url(item: dict[str, Any]) -> str | None:
     """Build a store search URL from the item's store name and product name."""
-    store = (item.get("store") or "").lower().strip()
-    name = item.get("name") or ""
+    return _search_url(
+        (item.get("store") or "").lower().strip(),
+        item.get("name") or "",
+        item.get("source_id"),
+    )
+
+
+@lru_cache(maxsize=4096)
+def _search_url(store: str, name: str, source_id: str | None) -> str | None:
+    """_build_search_url() body, cached on the (lowercased) store and name."""
     if not name:
         return None
 
     q = quote_plus(name)
 
-    # Try exact store match first, then partial
-    if store in STORE_SEARCH_URLS:
-        return STORE_SEARCH_URLS[store].format(q=q)
-    for key, tmpl in STORE_SEARCH_URLS.items():
-        if key in store or store in key:
-            return tmpl.format(q=q)
+    # Exact store match first, then a store key inside the name, then a
+    # truncated name inside a store key
+    tmpl = STORE_SEARCH_URLS.get(store)
+    if tmpl is None:
+        m = _STORE_KEY_RE.search(store)
+        if m is not None:
+            tmpl = STORE_SEARCH_URLS[m.group()]
+        else:
+            tmpl = next((t for k, t in STORE_SEARCH_URLS.items() if store in k), None)
+    if tmpl is not None:
+        return tmpl.format(q=q)
 
     # For Oda and other stores: kassal.app product page as link
-    source_id = item.get("source_id")
     if source_id:
         return f"https://kassal.app/vare/{source_id}"
     return None
 
 
-async def validate_urls(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+def _listed_price(store_prices: dict[str, float], item_store: str) -> float | None:
+    """Price listed for *item_store* (lowercased), or None if it isn't listed.
+
+    Store names usually match exactly; chain variants such as "eurospar"
+    vs "spar" fall back to a substring match in either direction.
+    """
+    price = store_prices.get(item_store)
+    if price is not None:
+        return price
+    for listed_store, price in store_prices.items():
+        if listed_store in item_store or item_store in listed_store:
+            return price
+    return None
+
+
+async def validate_urls(
+    items: Iterable[dict[str, Any]],
+    listing_cache: dict[str, asyncio.Future[dict[str, float] | None]] | None = None,
+) -> list[dict[str, Any]]:
     """Validate kassal items by checking kassal.app for active price listings.
 
     - Drops kassal items from excluded stores (Bunnpris, Coop, KIWI, REMA).
@@ -61,6 +106,9 @@ async def validate_urls(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
     - Products with no listed prices on kassal.app are filtered out (dead).
     - Live products get store search URLs since direct product links are stale.
     - eTilbudsavis items are never touched.
+
+    Pass the same *listing_cache* to every call in a run so that a product
+    appearing in several groups is only fetched from kassal.app once.
     """
     result: list[dict[str, Any]] = []
     to_check: list[dict[str, Any]] = []
@@ -81,7 +129,9 @@ async def validate_urls(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
         return result
 
     # Check kassal.app for active price listings
-    validated = await _verify_kassal_prices(to_check)
+    validated = await _verify_kassal_prices(
+        to_check, {} if listing_cache is None else listing_cache
+    )
     result.extend(validated)
 
     dropped = len(to_check) - len(validated)
@@ -93,99 +143,39 @@ async def validate_urls(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
     return result
 
 
-async def _verify_kassal_prices(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+async def _verify_kassal_prices(
+    items: list[dict[str, Any]],
+    listing_cache: dict[str, asyncio.Future[dict[str, float] | None]],
+) -> list[dict[str, Any]]:
     """Check kassal.app product pages for active price listings.
 
     For each item, fetches the kassal.app product page and verifies that
     at least one store has a listed price (product is not dead).
     If the item's specific store IS listed on the page, cross-checks the
     website price against the API price and corrects it if different.
+    Pages are fetched and parsed once per source_id through *listing_cache*.
     """
-    import asyncio
-
     semaphore = asyncio.Semaphore(_MAX_CONCURRENT)
 
-    # Regex: store logo alt text + price from the same listing block
-    _STORE_PRICE_RE = re.compile(
-        r'alt="([^"]+)"[^>]*class="h-10 w-10".*?'
-        r"text-(?:green|rose)-600[^>]*>\s*kr\s*([\d.,]+)",
-        re.DOTALL,
-    )
-
-    async def check_one(item: dict[str, Any]) -> dict[str, Any] | None:
-        source_id = item.get("source_id")
-        if not source_id:
-            return None
-
-        kassal_url = f"https://kassal.app/vare/{source_id}"
-        item_store = (item.get("store") or "").lower().strip()
-
+    async def fetch_listing(
+        client: httpx.AsyncClient, kassal_url: str
+    ) -> dict[str, float] | None:
+        """Return {store: price} listed on a kassal.app page, or None if dead."""
         async with semaphore:
             try:
-                async with httpx.AsyncClient(
-                    timeout=_TIMEOUT, follow_redirects=True
-                ) as client:
-                    resp = await client.get(
-                        kassal_url,
-                        headers={"User-Agent": "food-alert/1.0"},
-                    )
-
+                async with client.stream(
+                    "GET",
+                    kassal_url,
+                    headers={"User-Agent": "food-alert/1.0"},
+                ) as resp:
+                    # Dead pages are dropped on the status line alone,
+                    # without downloading their body.
                     if resp.status_code >= 400:
                         logger.debug(
-                            "Dead kassal page (%d): %s",
-                            resp.status_code,
-                            kassal_url,
-                        )
-                        return None
-
-                    text = resp.text
-
-                    # No price listings at all → product is dead
-                    if "price-product-" not in text:
-                        logger.debug(
-                            "No prices on kassal.app: %s (%s)",
-                            item.get("name"),
-                            kassal_url,
+                            "Dead kassal page (%d): %s", resp.status_code, kassal_url
                         )
                         return None
-
-                    # Parse store→price pairs from the page
-                    store_prices: dict[str, str] = {}
-                    for store_name, price_str in _STORE_PRICE_RE.findall(text):
-                        store_prices[store_name.lower().strip()] = price_str
-
-                    # If this item's store has a listed price, cross-check it
-                    for listed_store, price_str in store_prices.items():
-                        if (
-                            listed_store == item_store
-                            or listed_store in item_store
-                            or item_store in listed_store
-                        ):
-                            try:
-                                web_price = float(price_str.replace(",", ".").strip())
-                                api_price = item.get("price")
-                                if api_price and abs(web_price - api_price) > 0.01:
-                                    logger.info(
-                                        "Price correction %s @ %s: API=%.2f -> web=%.2f",
-                                        item.get("name"),
-                                        item.get("store"),
-                                        api_price,
-                                        web_price,
-                                    )
-                                    item["price"] = web_price
-                                    item["unit_price"] = None
-                            except ValueError:
-                                pass
-                            break
-
-                    # Product is alive — set store search URL
-                    search_url = _build_search_url(item)
-                    if search_url:
-                        item["url"] = search_url
-                    else:
-                        item["url"] = kassal_url
-                    return item
-
+                    await resp.aread()
             except (httpx.ConnectError, httpx.TimeoutException) as exc:
                 logger.debug(
                     "Kassal check failed: %s (%s)",
@@ -197,5 +187,67 @@ async def _verify_kassal_prices(items: list[dict[str, Any]]) -> list[dict[str, A
                 logger.debug("Kassal check error: %s", kassal_url, exc_info=True)
                 return None
 
-    results = await asyncio.gather(*(check_one(item) for item in items))
+        text = resp.text
+
+        # No price listings at all → product is dead
+        if "price-product-" not in text:
+            logger.debug("No prices on kassal.app: %s", kassal_url)
+            return None
+
+        # Parse store→price pairs from the page
+        store_prices: dict[str, float] = {}
+        for store_name, price_str in _STORE_PRICE_RE.findall(text):
+            try:
+                price = float(price_str.replace(",", "."))
+            except ValueError:
+                continue
+            store_prices[store_name.lower().strip()] = price
+        return store_prices
+
+    async def check_one(
+        client: httpx.AsyncClient, item: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        source_id = item.get("source_id")
+        if not source_id:
+            return None
+
+        kassal_url = f"https://kassal.app/vare/{source_id}"
+        item_store = (item.get("store") or "").lower().strip()
+
+        listing = listing_cache.get(source_id)
+        if listing is None:
+            listing = asyncio.ensure_future(fetch_listing(client, kassal_url))
+            listing_cache[source_id] = listing
+        store_prices = await listing
+        if store_prices is None:
+            return None
+
+        # If this item's store has a listed price, cross-check it
+        web_price = _listed_price(store_prices, item_store)
+        if web_price is not None:
+            api_price = item.get("price")
+            if api_price and abs(web_price - api_price) > 0.01:
+                logger.info(
+                    "Price correction %s @ %s: API=%.2f -> web=%.2f",
+                    item.get("name"),
+                    item.get("store"),
+                    api_price,
+                    web_price,
+                )
+                item["price"] = web_price
+                item["unit_price"] = None
+
+        # Product is alive — set store search URL (store already lowercased)
+        search_url = _search_url(item_store, item.get("name") or "", source_id)
+        if search_url:
+            item["url"] = search_url
+        else:
+            item["url"] = kassal_url
+        return item
+
+    # One pooled client for every page so connections are reused
+    async with httpx.AsyncClient(
+        timeout=_TIMEOUT, follow_redirects=True, limits=_LIMITS
+    ) as client:
+        results = await asyncio.gather(*(check_one(client, item) for item in items))
     return [r for r in results if r is not None]
@@ -0,0 +1,70 @@
+"""Shared test fixtures."""
+
+import sqlite3
+from typing import Callable
+
+import httpx
+import pytest
+
+from src import db as db_module
+
+
+@pytest.fixture(scope="session")
+def db_template() -> sqlite3.Connection:
+    """In-memory database holding just the schema, built once per session."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(db_module, "DB_PATH", ":memory:")
+        mp.setattr(db_module, "_CONN", None)
+        mp.setattr(db_module, "_CONN_PATH", None)
+        db_module.init_db()
+        template = db_module._connect()
+    yield template
+    template.close()
+
+
+@pytest.fixture
+def db(monkeypatch, db_template) -> sqlite3.Connection:
+    """Fresh in-memory price-history database, with the schema created.
+
+    Points ``src.db`` at ``:memory:`` so every test gets its own empty
+    database without touching the filesystem, and yields the shared
+    connection that the module's functions use. The schema is copied
+    from the session template rather than re-running ``init_db()``.
+    Durability is switched off: commits in tests never need to survive
+    a crash.
+    """
+    monkeypatch.setattr(db_module, "DB_PATH", ":memory:")
+    db_module.close_db()
+    conn = sqlite3.connect(":memory:")
+    db_template.backup(conn)
+    conn.executescript(
+        """
+        PRAGMA synchronous=OFF;
+        PRAGMA journal_mode=MEMORY;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA locking_mode=EXCLUSIVE;
+        """
+    )
+    monkeypatch.setattr(db_module, "_CONN", conn)
+    monkeypatch.setattr(db_module, "_CONN_PATH", ":memory:")
+    yield conn
+    db_module.close_db()
+
+
+@pytest.fixture
+def mock_httpx(monkeypatch) -> Callable[[str, Callable], None]:
+    """Route a module's httpx clients through a MockTransport.
+
+    Call as ``mock_httpx("src.url_validator", handler)``: every
+    ``httpx.AsyncClient`` the module opens afterwards answers requests
+    with *handler*, keeping its other arguments (timeouts, limits).
+    """
+    real_client = httpx.AsyncClient
+
+    def install(module: str, handler: Callable) -> None:
+        def client(**kwargs):
+            return real_client(transport=httpx.MockTransport(handler), **kwargs)
+
+        monkeypatch.setattr(f"{module}.httpx.AsyncClient", client)
+
+    return install
@@ -1,6 +1,8 @@
 """Tests for src.config — YAML loading."""
 
-from src.config import load_groups
+from unittest.mock import patch
+
+from src.config import load_groups, load_store_urls
 
 
 class TestLoadGroups:
@@ -21,3 +23,45 @@ class TestLoadGroups:
         config = load_groups()
         assert "notify" in config
         assert "top_n" in config["notify"]
+
+    def test_returns_independent_copies(self):
+        first = load_groups()
+        first["groups"].clear()
+        second = load_groups()
+        assert len(second["groups"]) > 0
+
+
+class TestLoadCached:
+    def test_reparses_only_when_file_changes(self, tmp_path):
+        from src.config import _load_cached
+
+        path = tmp_path / "data.txt"
+        path.write_text("a", encoding="utf-8")
+        calls = []
+
+        def parse(p):
+            calls.append(p)
+            return {"text": p.read_text(encoding="utf-8")}
+
+        assert _load_cached(path, parse) == {"text": "a"}
+        assert _load_cached(path, parse) == {"text": "a"}
+        assert len(calls) == 1
+
+        path.write_text("bb", encoding="utf-8")
+        assert _load_cached(path, parse) == {"text": "bb"}
+        assert len(calls) == 2
+
+
+class TestLoadStoreUrls:
+    def test_parses_sections(self, tmp_path):
+        (tmp_path / "online_store_links.txt").write_text(
+            "[Oda]\nhttps://oda.com/a\n\n# note\nhttps://oda.com/b\n[spar]\n",
+            encoding="utf-8",
+        )
+        with patch("src.config.CONFIG_DIR", tmp_path):
+            urls = load_store_urls()
+        assert urls == {"oda": ["https://oda.com/a", "https://oda.com/b"], "spar": []}
+
+    def test_missing_file_returns_empty(self, tmp_path):
+        with patch("src.config.CONFIG_DIR", tmp_path):
+            assert load_store_urls() == {}
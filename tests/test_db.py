@@ -1,153 +1,185 @@
 """Tests for db module — SQLite price history."""
 
 import sqlite3
-import tempfile
-from pathlib import Path
-from unittest.mock import patch
 
-import pytest
+from src import db as db_module
+from src.db import (
+    _connect,
+    get_all_time_best,
+    get_previous_best,
+    get_previous_top_ids,
+    record_run,
+)
 
 
 class TestInitDb:
-    def test_creates_tables(self):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            db_path = Path(tmpdir) / "test.db"
-            with patch("src.db.DB_PATH", db_path):
-                from src.db import init_db, _connect
-
-                init_db()
-
-                conn = sqlite3.connect(str(db_path))
-                tables = conn.execute(
-                    "SELECT name FROM sqlite_master WHERE type='table'"
-                ).fetchall()
-                table_names = {t[0] for t in tables}
-
-                assert "price_history" in table_names
-                assert "item_history" in table_names
-                conn.close()
+    def test_creates_tables(self, db):
+        tables = db.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        table_names = {t[0] for t in tables}
+
+        assert "price_history" in table_names
+        assert "item_history" in table_names
+
+    def test_history_lookups_use_group_date_index(self, db):
+        plan = db.execute(
+            """EXPLAIN QUERY PLAN
+               SELECT best_price FROM price_history
+               WHERE group_name = ? AND run_date < ?
+               ORDER BY run_date DESC LIMIT 1""",
+            ("egg", "2026-01-01"),
+        ).fetchall()
+        detail = " ".join(row[-1] for row in plan)
+        assert "USING INDEX" in detail
+        assert "TEMP B-TREE" not in detail
+
+
+class TestConnect:
+    def test_connection_is_reused_per_path(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(db_module, "_CONN", None)
+        monkeypatch.setattr(db_module, "_CONN_PATH", None)
+        monkeypatch.setattr(db_module, "DB_PATH", tmp_path / "a.db")
+        first = _connect()
+        assert _connect() is first
+        monkeypatch.setattr(db_module, "DB_PATH", tmp_path / "b.db")
+        assert _connect() is not first
+        db_module.close_db()
 
 
 class TestRecordRun:
-    def test_inserts_records(self):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            db_path = Path(tmpdir) / "test.db"
-            with patch("src.db.DB_PATH", db_path):
-                from src.db import init_db, record_run, _connect
-
-                init_db()
-
-                record_run(
-                    group_name="egg",
-                    best_price=3.5,
-                    best_item="Test Egg",
-                    best_store="SPAR",
-                    unit_label="kr/stk",
-                    top_items=[
-                        {
-                            "source": "kassal",
-                            "source_id": "123",
-                            "name": "Test Egg",
-                            "normalized_unit_price": 3.5,
-                            "price": 42,
-                            "store": "SPAR",
-                        }
-                    ],
-                )
-
-                conn = sqlite3.connect(str(db_path))
-                conn.row_factory = sqlite3.Row
-                row = conn.execute(
-                    "SELECT * FROM price_history WHERE group_name = 'egg'"
-                ).fetchone()
-
-                assert row is not None
-                assert row["best_price"] == 3.5
-                assert row["best_item"] == "Test Egg"
-                assert row["best_store"] == "SPAR"
-                conn.close()
+    def test_inserts_records(self, db):
+        record_run(
+            group_name="egg",
+            best_price=3.5,
+            best_item="Test Egg",
+            best_store="SPAR",
+            unit_label="kr/stk",
+            top_items=[
+                {
+                    "source": "kassal",
+                    "source_id": "123",
+                    "name": "Test Egg",
+                    "normalized_unit_price": 3.5,
+                    "price": 42,
+                    "store": "SPAR",
+                }
+            ],
+        )
+
+        row = db.execute(
+            """SELECT best_price, best_item, best_store
+               FROM price_history WHERE group_name = 'egg'"""
+        ).fetchone()
+
+        assert row == (3.5, "Test Egg", "SPAR")
+
+    def test_inserts_all_top_items(self, db):
+        top_items = [
+            {
+                "source": "kassal",
+                "source_id": str(i),
+                "name": f"Egg {i}",
+                "normalized_unit_price": 3.0 + i,
+                "price": 40 + i,
+                "store": "SPAR",
+            }
+            for i in range(3)
+        ]
+        record_run("egg", 3.0, "Egg 0", "SPAR", "kr/stk", top_items)
+        # Re-recording the same day updates instead of duplicating
+        record_run("egg", 3.0, "Egg 0", "SPAR", "kr/stk", top_items)
+
+        keys = [
+            r[0]
+            for r in db.execute("SELECT item_key FROM item_history ORDER BY item_key")
+        ]
+        assert keys == ["kassal:0", "kassal:1", "kassal:2"]
+
+
+class _CountingConnection(sqlite3.Connection):
+    """Connection that counts the statements sent through it."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls: list[str] = []
+
+    def execute(self, *args, **kwargs):
+        self.calls.append("execute")
+        return super().execute(*args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        self.calls.append("executemany")
+        return super().executemany(*args, **kwargs)
+
+
+class TestRecordRunBulk:
+    def test_top_items_inserted_in_one_batch(self, db, db_template, monkeypatch):
+        conn = sqlite3.connect(":memory:", factory=_CountingConnection)
+        db_template.backup(conn)
+        monkeypatch.setattr(db_module, "_CONN", conn)
+
+        top_items = [
+            {
+                "source": "kassal",
+                "source_id": str(i),
+                "name": f"Egg {i}",
+                "normalized_unit_price": 3.0,
+                "price": 40,
+                "store": "SPAR",
+            }
+            for i in range(10_000)
+        ]
+        record_run("egg", 3.0, "Egg 0", "SPAR", "kr/stk", top_items)
+
+        # One upsert for the best price, one batched insert for the items
+        assert conn.calls == ["execute", "executemany"]
+        (count,) = conn.execute("SELECT COUNT(*) FROM item_history").fetchone()
+        assert count == 10_000
+        conn.close()
 
 
 class TestGetAllTimeBest:
-    def test_returns_min_price(self):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            db_path = Path(tmpdir) / "test.db"
-            with patch("src.db.DB_PATH", db_path):
-                from src.db import init_db, record_run, get_all_time_best
-
-                init_db()
-
-                record_run("egg", 5.0, "Egg A", "SPAR", "kr/stk", [])
-
-                with patch("src.db.date") as mock_date:
-                    mock_date.today.return_value.isoformat.return_value = "2026-02-12"
-                    record_run("egg", 3.5, "Egg B", "Meny", "kr/stk", [])
+    def test_returns_min_price(self, db):
+        record_run("egg", 5.0, "Egg A", "SPAR", "kr/stk", [])
 
-                result = get_all_time_best("egg")
-                assert result == 3.5
+        record_run(
+            "egg", 3.5, "Egg B", "Meny", "kr/stk", [], today_fn=lambda: "2026-02-12"
+        )
 
-    def test_returns_none_for_missing_group(self):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            db_path = Path(tmpdir) / "test.db"
-            with patch("src.db.DB_PATH", db_path):
-                from src.db import init_db, get_all_time_best
+        assert get_all_time_best("egg") == 3.5
 
-                init_db()
-                result = get_all_time_best("nonexistent")
-                assert result is None
+    def test_returns_none_for_missing_group(self, db):
+        assert get_all_time_best("nonexistent") is None
 
 
 class TestGetPreviousBest:
-    def test_returns_previous_day_record(self):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            db_path = Path(tmpdir) / "test.db"
-            with patch("src.db.DB_PATH", db_path):
-                from src.db import init_db, _connect, get_previous_best
-
-                init_db()
-
-                # Insert a record for yesterday
-                conn = _connect()
-                conn.execute(
-                    """INSERT INTO price_history
-                       (group_name, run_date, best_price, best_item, best_store, unit_label)
-                       VALUES (?, ?, ?, ?, ?, ?)""",
-                    ("egg", "2026-01-01", 4.0, "Old Egg", "Joker", "kr/stk"),
-                )
-                conn.commit()
-                conn.close()
-
-                result = get_previous_best("egg")
-                assert result is not None
-                assert result["best_price"] == 4.0
-                assert result["best_item"] == "Old Egg"
+    def test_returns_previous_day_record(self, db):
+        # Insert a record for an earlier day
+        db.execute(
+            """INSERT INTO price_history
+               (group_name, run_date, best_price, best_item, best_store, unit_label)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            ("egg", "2026-01-01", 4.0, "Old Egg", "Joker", "kr/stk"),
+        )
+        db.commit()
+
+        result = get_previous_best("egg")
+        assert result is not None
+        assert result["best_price"] == 4.0
+        assert result["best_item"] == "Old Egg"
 
 
 class TestGetPreviousTopIds:
-    def test_returns_item_keys(self):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            db_path = Path(tmpdir) / "test.db"
-            with patch("src.db.DB_PATH", db_path):
-                from src.db import init_db, _connect, get_previous_top_ids
-
-                init_db()
-
-                # Insert records for yesterday
-                conn = _connect()
-                conn.execute(
-                    """INSERT INTO item_history
-                       (group_name, run_date, item_key, item_name, unit_price, price, store)
-                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                    ("egg", "2026-01-01", "kassal:123", "Egg A", 3.5, 42, "SPAR"),
-                )
-                conn.execute(
-                    """INSERT INTO item_history
-                       (group_name, run_date, item_key, item_name, unit_price, price, store)
-                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                    ("egg", "2026-01-01", "kassal:456", "Egg B", 4.0, 48, "Meny"),
-                )
-                conn.commit()
-                conn.close()
-
-                result = get_previous_top_ids("egg")
-                assert result == {"kassal:123", "kassal:456"}
+    def test_returns_item_keys(self, db):
+        # Insert records for an earlier day
+        db.executemany(
+            """INSERT INTO item_history
+               (group_name, run_date, item_key, item_name, unit_price, price, store)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            [
+                ("egg", "2026-01-01", "kassal:123", "Egg A", 3.5, 42, "SPAR"),
+                ("egg", "2026-01-01", "kassal:456", "Egg B", 4.0, 48, "Meny"),
+            ],
+        )
+        db.commit()
+
+        assert get_previous_top_ids("egg") == {"kassal:123", "kassal:456"}
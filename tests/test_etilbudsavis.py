@@ -1,65 +1,110 @@
 """Tests for src.etilbudsavis — offer normalization."""
 
-from src.etilbudsavis import _map_unit, normalize_offer
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from src import etilbudsavis
+from src.etilbudsavis import _is_current, _map_unit, normalize_offer
+
+# Shared base offer. normalize_offer never mutates its input, so tests
+# overlay their changes on a shallow copy rather than a deepcopy.
+_BASE_OFFER: dict = {
+    "id": "offer-1",
+    "heading": "Kyllingfilet 400 g",
+    "description": "Prior, 400 g, 124,75 pr. kg.",
+    "pricing": {"price": 49.90, "pre_price": None, "currency": "NOK"},
+    "quantity": {
+        "unit": {"symbol": "g", "si": {"symbol": "kg", "factor": 0.001}},
+        "size": {"from": 400, "to": 400},
+        "pieces": {"from": 1, "to": 1},
+    },
+    "dealer": {
+        "name": "Rema 1000",
+        "logo": "https://example.com/rema.png",
+        "markets": [{"slug": "REMA-1000", "country_code": "NO"}],
+    },
+    "branding": {"name": "Rema 1000", "logo": "https://example.com/rema.png"},
+    "images": {
+        "thumb": "https://example.com/thumb.jpg",
+        "view": "https://example.com/view.jpg",
+    },
+    "catalog_id": "abc123",
+    "run_from": "2026-02-01T00:00:00+01:00",
+    "run_till": "2026-02-15T00:00:00+01:00",
+}
+
+
+def _raw_offer(**overrides):
+    return {**_BASE_OFFER, **overrides}
+
+
+class TestSharedClient:
+    def test_client_reused_until_closed(self):
+        async def scenario():
+            first = await etilbudsavis._get_client()
+            second = await etilbudsavis._get_client()
+            await etilbudsavis.aclose()
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        assert first is second
+        assert first.is_closed
+        assert etilbudsavis._client is None
+
+
+class TestIsCurrent:
+    NOW = datetime(2026, 2, 10, 12, 0, tzinfo=timezone.utc)
+
+    def test_inside_window(self):
+        offer = {
+            "run_from": "2026-02-01T00:00:00+0100",
+            "run_till": "2026-02-15T00:00:00+01:00",
+        }
+        assert _is_current(offer, self.NOW) is True
 
+    def test_expired(self):
+        offer = {
+            "run_from": "2026-01-01T00:00:00+01:00",
+            "run_till": "2026-02-10T12:30:00+01:00",
+        }
+        # 12:30+01:00 is 11:30 UTC — already over, despite sorting after "12:00"
+        assert _is_current(offer, self.NOW) is False
 
-class TestMapUnit:
-    def test_kilogram(self):
-        assert _map_unit("kg") == "kilogram"
-        assert _map_unit("Kilogram") == "kilogram"
+    def test_valid_from_fallback_keys(self):
+        offer = {
+            "valid_from": "2026-02-11T00:00:00+00:00",
+            "valid_until": "2026-02-20T00:00:00+00:00",
+        }
+        assert _is_current(offer, self.NOW) is False
+
+    def test_missing_or_bad_dates_kept(self):
+        assert _is_current({}, self.NOW) is True
+        assert _is_current({"run_from": None, "run_till": None}, self.NOW) is True
+        assert _is_current({"run_from": "soon", "run_till": "later"}, self.NOW) is True
 
-    def test_gram(self):
-        assert _map_unit("g") == "kilogram"
 
-    def test_liter(self):
-        assert _map_unit("l") == "liter"
-        assert _map_unit("liter") == "liter"
-        assert _map_unit("litre") == "liter"
+class TestMapUnit:
+    @pytest.mark.parametrize("raw", ["kg", "Kilogram", "g"])
+    def test_weight_units(self, raw):
+        assert _map_unit(raw) == "kilogram"
 
-    def test_sub_volumes(self):
-        assert _map_unit("dl") == "liter"
-        assert _map_unit("ml") == "liter"
-        assert _map_unit("cl") == "liter"
+    @pytest.mark.parametrize("raw", ["l", "liter", "litre", "dl", "ml", "cl"])
+    def test_volume_units(self, raw):
+        assert _map_unit(raw) == "liter"
 
-    def test_piece(self):
-        assert _map_unit("stk") == "piece"
-        assert _map_unit("pk") == "piece"
+    @pytest.mark.parametrize("raw", ["stk", "pk"])
+    def test_piece(self, raw):
+        assert _map_unit(raw) == "piece"
 
     def test_none(self):
         assert _map_unit(None) is None
 
 
 class TestNormalizeOffer:
-    def _raw_offer(self, **overrides):
-        base = {
-            "id": "offer-1",
-            "heading": "Kyllingfilet 400 g",
-            "description": "Prior, 400 g, 124,75 pr. kg.",
-            "pricing": {"price": 49.90, "pre_price": None, "currency": "NOK"},
-            "quantity": {
-                "unit": {"symbol": "g", "si": {"symbol": "kg", "factor": 0.001}},
-                "size": {"from": 400, "to": 400},
-                "pieces": {"from": 1, "to": 1},
-            },
-            "dealer": {
-                "name": "Rema 1000",
-                "logo": "https://example.com/rema.png",
-                "markets": [{"slug": "REMA-1000", "country_code": "NO"}],
-            },
-            "branding": {"name": "Rema 1000", "logo": "https://example.com/rema.png"},
-            "images": {
-                "thumb": "https://example.com/thumb.jpg",
-                "view": "https://example.com/view.jpg",
-            },
-            "catalog_id": "abc123",
-            "run_from": "2026-02-01T00:00:00+01:00",
-            "run_till": "2026-02-15T00:00:00+01:00",
-        }
-        base.update(overrides)
-        return base
-
     def test_basic_normalization(self):
-        result = normalize_offer(self._raw_offer())
+        result = normalize_offer(_raw_offer())
         assert result is not None
         assert result["source"] == "etilbudsavis"
         assert result["source_id"] == "offer-1"
@@ -73,22 +118,22 @@ class TestNormalizeOffer:
         assert result["weight_unit"] == "g"
 
     def test_image_extracted(self):
-        result = normalize_offer(self._raw_offer())
+        result = normalize_offer(_raw_offer())
         assert result["image"] == "https://example.com/view.jpg"
 
     def test_url_built_from_catalog(self):
-        result = normalize_offer(self._raw_offer())
+        result = normalize_offer(_raw_offer())
         assert result["url"] is not None
         assert "etilbudsavis.no" in result["url"]
         assert "REMA-1000" in result["url"]
         assert "abc123" in result["url"]
 
     def test_no_price_returns_none(self):
-        result = normalize_offer(self._raw_offer(pricing={"price": None}))
+        result = normalize_offer(_raw_offer(pricing={"price": None}))
         assert result is None
 
     def test_missing_pricing_uses_top_level(self):
-        offer = self._raw_offer()
+        offer = _raw_offer()
         offer["pricing"] = {}
         offer["price"] = 39.90
         result = normalize_offer(offer)
@@ -97,7 +142,7 @@ class TestNormalizeOffer:
 
     def test_pack_size_from_pieces(self):
         """For pcs/stk items, pack_size comes from size (count), not pieces (packs)."""
-        offer = self._raw_offer(
+        offer = _raw_offer(
             quantity={
                 "unit": {"symbol": "pcs", "si": {"symbol": "pcs", "factor": 1}},
                 "size": {"from": 12, "to": 12},
@@ -110,49 +155,78 @@ class TestNormalizeOffer:
         assert result["unit_price"] == 4.16
 
     def test_no_dealer_defaults_to_ukjent(self):
-        offer = self._raw_offer(dealer={}, branding={})
+        offer = _raw_offer(dealer={}, branding={})
         result = normalize_offer(offer)
         assert result["store"] == "Ukjent"
 
     def test_validity_dates(self):
-        result = normalize_offer(self._raw_offer())
+        result = normalize_offer(_raw_offer())
         assert result["valid_from"] == "2026-02-01T00:00:00+01:00"
         assert result["valid_until"] == "2026-02-15T00:00:00+01:00"
 
-    def test_unit_price_from_description_fallback(self):
-        """When quantity data is missing, parse unit price from description."""
-        offer = self._raw_offer(
-            quantity={},
-            description="Solvinge, 1000 g, 169,90 pr. kg.",
-        )
-        result = normalize_offer(offer)
-        assert result["unit_price"] == 169.90
+    @pytest.mark.parametrize(
+        "overrides,expected",
+        [
+            pytest.param(
+                # When quantity data is missing, parse it from the description
+                {"quantity": {}, "description": "Solvinge, 1000 g, 169,90 pr. kg."},
+                169.90,
+                id="description_fallback",
+            ),
+            pytest.param(
+                # 1kg product should have unit_price = price
+                {
+                    "pricing": {"price": 99.0, "pre_price": 139.0, "currency": "NOK"},
+                    "quantity": {
+                        "unit": {"symbol": "kg", "si": {"symbol": "kg", "factor": 1}},
+                        "size": {"from": 1, "to": 1},
+                        "pieces": {"from": 1, "to": 1},
+                    },
+                },
+                99.0,
+                id="kg_unit_price",
+            ),
+            pytest.param(
+                # 2x400g for 86 kr should be 107.50 kr/kg
+                {
+                    "pricing": {"price": 86.0, "pre_price": None, "currency": "NOK"},
+                    "quantity": {
+                        "unit": {
+                            "symbol": "g",
+                            "si": {"symbol": "kg", "factor": 0.001},
+                        },
+                        "size": {"from": 400, "to": 400},
+                        "pieces": {"from": 2, "to": 2},
+                    },
+                    "description": "400 g Fra 107,50/kg. Før fra 65,30 pr pk.",
+                },
+                107.5,
+                id="multi_pack",
+            ),
+        ],
+    )
+    def test_kilogram_unit_price(self, overrides, expected):
+        result = normalize_offer(_raw_offer(**overrides))
+        assert result is not None
+        assert result["unit_price"] == expected
         assert result["base_unit"] == "kilogram"
 
-    def test_kg_unit_price(self):
-        """1kg product should have unit_price = price."""
-        offer = self._raw_offer(
+    def test_promos_detected(self):
+        offer = _raw_offer(
+            heading="Kyllingfilet 3 for 2",
+            description="Spar kr 40 nå! Medlemspris -20%",
             pricing={"price": 99.0, "pre_price": 139.0, "currency": "NOK"},
-            quantity={
-                "unit": {"symbol": "kg", "si": {"symbol": "kg", "factor": 1}},
-                "size": {"from": 1, "to": 1},
-                "pieces": {"from": 1, "to": 1},
-            },
         )
         result = normalize_offer(offer)
-        assert result["unit_price"] == 99.0
-
-    def test_multi_pack_unit_price(self):
-        """2x400g for 86 kr should be 107.50 kr/kg."""
-        offer = self._raw_offer(
-            pricing={"price": 86.0, "pre_price": None, "currency": "NOK"},
-            quantity={
-                "unit": {"symbol": "g", "si": {"symbol": "kg", "factor": 0.001}},
-                "size": {"from": 400, "to": 400},
-                "pieces": {"from": 2, "to": 2},
-            },
-            description="400 g Fra 107,50/kg. Før fra 65,30 pr pk.",
-        )
+        assert result["promos"] == [
+            "Før 139 kr",
+            "3 for 2",
+            "Spar 40 kr",
+            "Medlemsrabatt",
+            "-20%",
+        ]
+
+    def test_spar_percent_promo(self):
+        offer = _raw_offer(heading="Laks 2 for 100", description="Spar 25 %")
         result = normalize_offer(offer)
-        assert result is not None
-        assert result["unit_price"] == 107.5
+        assert result["promos"] == ["2 for ...", "Spar 25%"]
@@ -1,7 +1,19 @@
 """Tests for src.filters — whitelist/blacklist & dedup."""
 
-from src.filters import deduplicate, filter_items, matches_group
+import asyncio
+import re
+import time
+from unittest.mock import patch
 
+import pytest
+
+from src.filters import (
+    deduplicate,
+    filter_items,
+    iter_filtered,
+    matches_group,
+)
+from src.main import process_group
 
 # ---------------------------------------------------------------------------
 # matches_group
@@ -77,6 +89,40 @@ class TestMatchesGroup:
         )
         assert matches_group(item, group) is True
 
+    def test_include_terms_matched_literally(self):
+        group = self._group(include_any=["mild&snill (1kg)"])
+        assert matches_group({"name": "Kylling MILD&SNILL (1KG)"}, group) is True
+        assert matches_group({"name": "Kylling mild&snill 1kg"}, group) is False
+
+    def test_reused_group_gives_same_results(self):
+        group = self._group(include_any=["egg"], exclude=["sjokolade"])
+        items = [{"name": "Egg 12pk"}, {"name": "Sjokolade egg"}, {"name": "Melk"}]
+        first = [matches_group(it, group) for it in items]
+        second = [matches_group(it, group) for it in items]
+        assert first == second == [True, False, False]
+
+    def test_edited_group_uses_new_terms(self):
+        group = self._group(include_any=["egg"])
+        assert matches_group({"name": "Melk"}, group) is False
+        group["include_any"].append("melk")
+        assert matches_group({"name": "Melk"}, group) is True
+
+    def test_many_terms_compiled_once_per_group(self):
+        group = self._group(
+            include_any=[f"vare{i}" for i in range(200)],
+            exclude=[f"stopp{i}" for i in range(100)],
+        )
+        items = [
+            {"name": f"VARE{i}" + (" Stopp7" if i % 2 else "")} for i in range(200)
+        ]
+        with patch("src.filters.re.compile", wraps=re.compile) as compile_:
+            first = [matches_group(it, group) for it in items]
+            second = [matches_group(it, group) for it in items]
+        # One regex for includes, one for excludes — built on first use only
+        assert compile_.call_count == 2
+        assert first == second
+        assert sum(first) == 100
+
 
 # ---------------------------------------------------------------------------
 # filter_items
@@ -102,6 +148,53 @@ class TestFilterItems:
     def test_empty_list(self):
         assert filter_items([], {"name": "x", "include_any": ["a"]}) == []
 
+    def test_drops_excluded_stores(self):
+        items = [
+            {"name": "Egg 12pk", "store": "Bunnpris Storo"},
+            {"name": "Egg 12pk", "store": "SPAR"},
+            {"name": "Egg 18pk"},
+        ]
+        result = filter_items(items, {"name": "egg", "include_any": ["egg"]})
+        assert [r.get("store") for r in result] == ["SPAR", None]
+
+    def test_drops_excluded_kassal_stores(self):
+        items = [
+            {"name": "Egg 12pk", "store": "KIWI", "source": "kassal"},
+            {"name": "Egg 12pk", "store": "KIWI", "source": "etilbudsavis"},
+            {"name": "Egg 12pk", "store": "Meny", "source": "kassal"},
+        ]
+        result = filter_items(items, {"name": "egg", "include_any": ["egg"]})
+        assert [(r["store"], r["source"]) for r in result] == [
+            ("KIWI", "etilbudsavis"),
+            ("Meny", "kassal"),
+        ]
+
+    def test_filtered_stream_is_validated_before_dedup(self, db):
+        items = [
+            {"name": "Egg 12pk", "store": "SPAR", "price": 40, "source": "a"},
+            {"name": "Egg 12pk", "store": "SPAR", "price": 40, "source": "b"},
+            {"name": "Melk", "store": "SPAR", "price": 20},
+        ]
+        group = {"name": "egg", "include_any": ["egg"]}
+        validated = []
+
+        async def fake_validate(stream, listing_cache=None):
+            # A lazy filter stream, with duplicates still in it
+            assert not isinstance(stream, list)
+            validated.extend(stream)
+            return validated
+
+        with (
+            patch("src.main.validate_urls", fake_validate),
+            patch("src.main.deduplicate", wraps=deduplicate) as dedup,
+        ):
+            asyncio.run(process_group(group, online_store_cache=items))
+
+        assert validated == list(iter_filtered(items, group))
+        assert [i["source"] for i in validated] == ["a", "b"]
+        dedup.assert_called_once_with(validated)
+        assert len(deduplicate(validated)) == 1
+
 
 # ---------------------------------------------------------------------------
 # deduplicate
@@ -109,6 +202,26 @@ class TestFilterItems:
 
 
 class TestDeduplicate:
+    @pytest.mark.perf
+    @pytest.mark.parametrize("n", [1000, 100_000])
+    def test_bulk_dedup_is_linear(self, n):
+        items = [
+            {
+                "source": "kassal",
+                "source_id": str(i % 50_000),
+                "name": f"Vare {i % 50_000} 500g",
+                "store": "Kiwi",
+                "price": 10,
+            }
+            for i in range(n)
+        ]
+        start = time.perf_counter()
+        result = deduplicate(items)
+        elapsed = time.perf_counter() - start
+
+        assert len(result) == min(n, 50_000)
+        assert elapsed < 1.0
+
     def test_removes_dupes_by_source_id(self):
         items = [
             {"source": "kassal", "source_id": "123", "name": "A"},
@@ -164,3 +277,59 @@ class TestDeduplicate:
 
     def test_empty_list(self):
         assert deduplicate([]) == []
+
+    def test_weight_suffix_dedup_across_sources(self):
+        items = [
+            {
+                "source": "coop",
+                "source_id": "1",
+                "name": "Coop Kyllingfilet 1000g",
+                "store": "Extra",
+                "price": 119.9,
+            },
+            {
+                "source": "etilbudsavis",
+                "source_id": "2",
+                "name": "COOP KYLLINGFILET",
+                "store": "Extra",
+                "price": 119.9,
+            },
+        ]
+        result = deduplicate(items)
+        assert [r["source_id"] for r in result] == ["1"]
+
+    def test_cross_store_winner_keeps_first_position(self):
+        items = [
+            {
+                "source": "onlinestore",
+                "source_id": "a",
+                "name": "Egg",
+                "store": "MENY",
+                "price": 60,
+            },
+            {
+                "source": "etilbudsavis",
+                "source_id": "b",
+                "name": "Melk",
+                "store": "Kiwi",
+                "price": 20,
+            },
+            {
+                "source": "onlinestore",
+                "source_id": "c",
+                "name": "Egg",
+                "store": "SPAR",
+                "price": 50,
+            },
+            {
+                "source": "onlinestore",
+                "source_id": "d",
+                "name": "Egg",
+                "store": "JOKER",
+                "price": 50,
+            },
+        ]
+        result = deduplicate(items)
+        assert [r["name"] for r in result] == ["Egg", "Melk"]
+        assert result[0]["store"] == "SPAR / JOKER"
+        assert result[0]["price"] == 50
@@ -0,0 +1,127 @@
+"""Tests for src.main — group pipeline and Holdbart change detection."""
+
+import asyncio
+import json
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from src.main import _content_changed, _content_fingerprint, process_group
+
+_GROUP = {"name": "kylling", "include_any": ["kyllingfilet"], "base_unit": "kilogram"}
+
+
+def _kassal(source_id, store, price):
+    return {
+        "source": "kassal",
+        "source_id": source_id,
+        "name": "Kyllingfilet 1kg",
+        "store": store,
+        "price": price,
+        "weight": 1,
+        "weight_unit": "kg",
+    }
+
+
+def _listing(store, price):
+    return (
+        f'<div class="price-product-1"><img alt="{store}" class="h-10 w-10">'
+        f'<span class="text-green-600">kr {price},00</span></div>'
+    )
+
+
+def _group(source_id, unit_price):
+    return {
+        "display_name": "Egg",
+        "top_items": [{"source_id": source_id, "normalized_unit_price": unit_price}],
+    }
+
+
+class TestProcessGroup:
+    """Dedup must only see items that survived store exclusion and validation."""
+
+    @pytest.mark.parametrize("kiwi_price", [90, 100])
+    def test_excluded_store_does_not_shadow_live_listing(
+        self, db, mock_httpx, kiwi_price
+    ):
+        mock_httpx(
+            "src.url_validator",
+            lambda request: httpx.Response(200, text=_listing("Meny", 100)),
+        )
+        items = [_kassal("1", "KIWI", kiwi_price), _kassal("2", "Meny", 100)]
+
+        _, _, top_items, _ = asyncio.run(
+            process_group(_GROUP, online_store_cache=items)
+        )
+
+        assert [(i["store"], i["price"]) for i in top_items] == [("Meny", 100.0)]
+
+    def test_dead_cheapest_listing_does_not_shadow_live_one(self, db, mock_httpx):
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path.endswith("/1"):
+                return httpx.Response(404, text="gone")
+            return httpx.Response(200, text=_listing("Meny", 100))
+
+        mock_httpx("src.url_validator", handler)
+        items = [_kassal("1", "SPAR", 90), _kassal("2", "Meny", 100)]
+
+        _, _, top_items, _ = asyncio.run(
+            process_group(_GROUP, online_store_cache=items)
+        )
+
+        assert [(i["store"], i["price"]) for i in top_items] == [("Meny", 100.0)]
+
+
+class TestContentChanged:
+    @staticmethod
+    def _changed(tmp_path, last, current):
+        """_content_changed() for *current* after a run that stored *last*."""
+        (tmp_path / "last_run.fingerprint.json").write_text(
+            json.dumps(_content_fingerprint(*last))
+        )
+        with patch("src.main.DATA_DIR", tmp_path):
+            return _content_changed(_content_fingerprint(*current))
+
+    def test_changed_without_previous_fingerprint(self, tmp_path):
+        with patch("src.main.DATA_DIR", tmp_path):
+            assert _content_changed(_content_fingerprint([_group("a", 50.0)], [], []))
+
+    def test_unchanged_when_fingerprint_matches(self, tmp_path):
+        run = ([_group("a", 50.0)], [], [{"source_id": "p1"}])
+        assert not self._changed(tmp_path, run, run)
+
+    def test_top_item_change(self, tmp_path):
+        base = ([_group("a", 50.0)], [], [])
+        assert self._changed(tmp_path, base, ([_group("b", 50.0)], [], []))
+        assert self._changed(tmp_path, base, ([_group("a", 45.0)], [], []))
+        assert self._changed(tmp_path, base, ([{"top_items": []}], [], []))
+        assert not self._changed(tmp_path, base, ([_group("a", 50.01)], [], []))
+
+    @pytest.mark.parametrize(
+        "last, current, changed",
+        [
+            (50.04, 50.06, False),
+            (50.15, 50.25, False),
+            (50.25, 50.15, False),
+            (50.0, 50.11, True),
+            (50.0, 49.89, True),
+            (50.0, 50.2, True),
+        ],
+    )
+    def test_unit_price_tolerance(self, tmp_path, last, current, changed):
+        assert (
+            self._changed(
+                tmp_path,
+                ([_group("a", last)], [], []),
+                ([_group("a", current)], [], []),
+            )
+            is changed
+        )
+
+    def test_trigger_count_change(self, tmp_path):
+        assert self._changed(tmp_path, ([], [], []), ([], [{"type": "new_best"}], []))
+
+    def test_promo_order_does_not_matter(self, tmp_path):
+        promos = [{"source_id": "p1"}, {"source_id": "p2"}]
+        assert not self._changed(tmp_path, ([], [], promos), ([], [], promos[::-1]))
@@ -1,29 +1,25 @@
 """Tests for src.normalizer — unit price computation & enrichment."""
 
-from src.normalizer import _canon_unit, compute_unit_price, enrich_items
+import time
 
+import pytest
 
-class TestCanonUnit:
-    def test_kilogram_variants(self):
-        for raw in ("kg", "kilogram", "KG", "Kilogram"):
-            assert _canon_unit(raw) == "kilogram"
+from src import etilbudsavis
+from src.normalizer import UNIT_MAP, _canon_unit, compute_unit_price, enrich_items
 
-    def test_gram(self):
-        assert _canon_unit("g") == "kilogram"
-        assert _canon_unit("gram") == "kilogram"
 
-    def test_liter_variants(self):
-        for raw in ("l", "liter", "litre", "L"):
-            assert _canon_unit(raw) == "liter"
+class TestCanonUnit:
+    @pytest.mark.parametrize("raw", ["kg", "kilogram", "KG", "Kilogram", "g", "gram"])
+    def test_weight_units(self, raw):
+        assert _canon_unit(raw) == "kilogram"
 
-    def test_volume_sub_units(self):
-        assert _canon_unit("dl") == "liter"
-        assert _canon_unit("cl") == "liter"
-        assert _canon_unit("ml") == "liter"
+    @pytest.mark.parametrize("raw", ["l", "liter", "litre", "L", "dl", "cl", "ml"])
+    def test_volume_units(self, raw):
+        assert _canon_unit(raw) == "liter"
 
-    def test_piece(self):
-        for raw in ("stk", "stk.", "piece", "pk", "pakke"):
-            assert _canon_unit(raw) == "piece"
+    @pytest.mark.parametrize("raw", ["stk", "stk.", "piece", "pk", "pakke"])
+    def test_piece(self, raw):
+        assert _canon_unit(raw) == "piece"
 
     def test_none(self):
         assert _canon_unit(None) is None
@@ -32,43 +28,72 @@ class TestCanonUnit:
         assert _canon_unit("dozen") == "dozen"
 
 
-class TestComputeUnitPrice:
-    def _item(self, **kw):
-        base = {"name": "Test", "price": 50.0}
-        base.update(kw)
-        return base
+class TestUnitMap:
+    GOLDEN = {
+        "kg": "kilogram",
+        "kilogram": "kilogram",
+        "g": "kilogram",
+        "gram": "kilogram",
+        "hg": "kilogram",
+        "l": "liter",
+        "liter": "liter",
+        "litre": "liter",
+        "dl": "liter",
+        "cl": "liter",
+        "ml": "liter",
+        "stk": "piece",
+        "pcs": "piece",
+        "piece": "piece",
+        "pieces": "piece",
+        "pk": "piece",
+        "pakke": "piece",
+    }
+
+    def test_matches_golden_table(self):
+        assert UNIT_MAP == self.GOLDEN
+
+    def test_etilbudsavis_shares_table(self):
+        assert etilbudsavis.UNIT_MAP is UNIT_MAP
+        for raw, unit in self.GOLDEN.items():
+            assert etilbudsavis._map_unit(raw.upper()) == unit
+
+
+def _item(**kw):
+    return {"name": "Test", "price": 50.0, **kw}
 
+
+class TestComputeUnitPrice:
     def test_existing_unit_price_matching_target(self):
-        item = self._item(unit_price=100.0, base_unit="kilogram")
+        item = _item(unit_price=100.0, base_unit="kilogram")
         assert compute_unit_price(item, "kilogram") == 100.0
 
     def test_derive_from_weight_kg(self):
-        item = self._item(price=50.0, weight=0.5, weight_unit="kg")
+        item = _item(price=50.0, weight=0.5, weight_unit="kg")
         result = compute_unit_price(item, "kilogram")
         assert result == 100.0  # 50 / 0.5
 
     def test_derive_from_weight_gram(self):
-        item = self._item(price=30.0, weight=500, weight_unit="g")
+        item = _item(price=30.0, weight=500, weight_unit="g")
         result = compute_unit_price(item, "kilogram")
         assert result == 60.0  # 30 / 0.5kg
 
     def test_derive_from_volume_dl(self):
-        item = self._item(price=20.0, weight=5, weight_unit="dl")
+        item = _item(price=20.0, weight=5, weight_unit="dl")
         result = compute_unit_price(item, "liter")
         assert result == 40.0  # 20 / 0.5L
 
     def test_derive_from_volume_ml(self):
-        item = self._item(price=10.0, weight=500, weight_unit="ml")
+        item = _item(price=10.0, weight=500, weight_unit="ml")
         result = compute_unit_price(item, "liter")
         assert result == 20.0  # 10 / 0.5L
 
     def test_piece_with_pack_size(self):
-        item = self._item(price=36.0, pack_size=12)
+        item = _item(price=36.0, pack_size=12)
         result = compute_unit_price(item, "piece")
         assert result == 3.0
 
     def test_piece_no_pack_size_defaults_to_1(self):
-        item = self._item(price=25.0)
+        item = _item(price=25.0)
         result = compute_unit_price(item, "piece")
         assert result == 25.0
 
@@ -78,7 +103,7 @@ class TestComputeUnitPrice:
 
     def test_weight_unit_mismatch_returns_none_or_fallback(self):
         # Weight is in kg but target is liter => no weight-based calc possible
-        item = self._item(price=50.0, weight=1, weight_unit="kg")
+        item = _item(price=50.0, weight=1, weight_unit="kg")
         result = compute_unit_price(item, "liter")
         # Should be None (no volume info, no existing unit_price)
         assert result is None
@@ -106,3 +131,17 @@ class TestEnrichItems:
 
     def test_empty_list(self):
         assert enrich_items([], "kilogram") == []
+
+    @pytest.mark.perf
+    def test_bulk_enrich_within_budget(self):
+        items = [
+            {"name": "X", "price": 50.0, "weight": 1.0, "weight_unit": "kg"}
+            for _ in range(100_000)
+        ]
+        start = time.perf_counter()
+        result = enrich_items(items, "kilogram")
+        elapsed = time.perf_counter() - start
+
+        assert len(result) == 100_000
+        assert result[-1]["normalized_unit_price"] == 50.0
+        assert elapsed < 0.2
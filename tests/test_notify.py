@@ -1,5 +1,9 @@
 """Tests for src.notify — email formatting."""
 
+import time
+
+import pytest
+
 from src.notify import build_email, build_email_html
 
 
@@ -90,6 +94,93 @@ class TestBuildEmailHtml:
         assert "Varsler" not in html
         assert "Egg" in html
 
+    @pytest.mark.perf
+    def test_many_groups_build_in_linear_time(self):
+        group_data = [
+            {
+                "display_name": f"Gruppe {g}",
+                "top_items": [
+                    {
+                        "name": f"Vare {g}-{i}",
+                        "source": "kassal",
+                        "normalized_unit_price": 3.5 + i,
+                        "price": 50,
+                        "store": "SPAR",
+                        "target_unit": "piece",
+                        "url": "",
+                    }
+                    for i in range(20)
+                ],
+            }
+            for g in range(50)
+        ]
+        start = time.perf_counter()
+        _, html = build_email_html(group_data, [])
+        elapsed = time.perf_counter() - start
+
+        assert len(html) > 10_000
+        positions = [html.index(f"Gruppe {g}<") for g in range(50)]
+        assert positions == sorted(positions)
+        assert all(f"Vare {g}-19<" in html for g in range(50))
+        assert elapsed < 0.05
+
     def test_html_subject(self):
         subject, _ = build_email_html([], [{"type": "x", "message": "m"}])
         assert "1 varsler" in subject
+
+    def test_html_escapes_scraped_text(self):
+        group_data = [
+            {
+                "display_name": "🥚 Egg",
+                "top_items": [
+                    {
+                        "name": "Egg <b>12pk</b>",
+                        "source": "kassal",
+                        "normalized_unit_price": 3.5,
+                        "price": 50,
+                        "store": "Bunnpris & Co",
+                        "target_unit": "piece",
+                        "url": "https://x/egg?a=1&b=2",
+                    }
+                ],
+            }
+        ]
+        _, html = build_email_html(group_data, [])
+        assert "<b>12pk" not in html
+        assert "Egg &lt;b&gt;12pk&lt;/b&gt;" in html
+        assert "Bunnpris &amp; Co" in html
+        assert 'href="https://x/egg?a=1&amp;b=2"' in html
+
+    def test_html_handles_missing_url_and_image(self):
+        item = {
+            "name": "Kyllingfilet 400 g",
+            "source": "etilbudsavis",
+            "normalized_unit_price": 124.75,
+            "price": 49.9,
+            "store": "Rema 1000",
+            "target_unit": "kilogram",
+            "url": None,
+            "image": None,
+            "promos": ["3 for 2"],
+        }
+        group_data = [{"display_name": "🐔 Kylling", "top_items": [item]}]
+        _, html = build_email_html(group_data, [], [item])
+        assert "Kyllingfilet 400 g" in html
+        assert "None" not in html
+
+    def test_html_promo_section(self):
+        promos = [
+            {
+                "name": "Kyllingfilet",
+                "promos": ["3 for 2"],
+                "unit_price": 129.9,
+                "base_unit": "kilogram",
+                "price": 89.9,
+                "store": "SPAR",
+            },
+            {"name": "Egg", "promos": ["Medlemspris"], "price": 40, "store": "REMA"},
+        ]
+        _, html = build_email_html([], [], promos)
+        assert "Spesialtilbud" in html
+        assert "129.90 kr/kg" in html
+        assert html.index("Kyllingfilet") < html.index("Egg")
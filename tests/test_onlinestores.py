@@ -1,11 +1,27 @@
 """Tests for onlinestores module — ngdata API scraping."""
 
+import asyncio
+from unittest.mock import patch
+
+import httpx
 import pytest
 
-from src.onlinestores import _url_to_facet
+from src.onlinestores import (
+    _parse_coop_html,
+    _scrape_coop,
+    _url_to_facet,
+    scrape_urls,
+)
 
 
 class TestUrlToFacet:
+    def test_repeated_url_is_cached(self):
+        url = "https://meny.no/varer/meieri-egg/egg"
+        _url_to_facet.cache_clear()
+        first = _url_to_facet(url)
+        assert _url_to_facet(url) is first
+        assert _url_to_facet.cache_info().hits == 1
+
     def test_meny_egg_url(self):
         url = "https://meny.no/varer/meieri-egg/egg"
         result = _url_to_facet(url)
@@ -54,3 +70,77 @@ class TestUrlToFacet:
         result = _url_to_facet(url)
         assert result is not None
         assert "Egg" in result[2]
+
+    def test_falls_back_to_parent_slug(self):
+        url = "https://meny.no/varer/kylling-og-fjaerkre/ukjent-underkategori"
+        result = _url_to_facet(url)
+        assert result is not None
+        assert result[2] == "Categories:Kylling og fjærkre"
+
+
+class TestScrapeUrls:
+    def test_results_keep_url_order(self):
+        async def fake_ngdata(store_id, product_id, store_name, facet, client):
+            # Finish in reverse order of submission
+            await asyncio.sleep(0.01 if store_name == "MENY" else 0)
+            return [{"store": store_name}]
+
+        async def fake_oda(url):
+            return [{"store": "Oda"}]
+
+        async def fake_coop():
+            return [{"store": "Coop"}]
+
+        urls = [
+            "https://meny.no/varer/meieri-egg/egg",
+            "https://oda.com/no/categories/1283-meieri-ost-og-egg/50-egg/",
+            "https://spar.no/varer/kylling-og-fjaerkre/kylling",
+            "https://meny.no/varer/meieri-egg/egg",  # duplicate facet
+            "https://oda.com/no/categories/1283-meieri-ost-og-egg/50-egg/",  # again
+        ]
+        with (
+            patch("src.onlinestores._scrape_ngdata", fake_ngdata),
+            patch("src.onlinestores._scrape_oda_page", fake_oda),
+            patch("src.onlinestores._scrape_coop", fake_coop),
+        ):
+            products = asyncio.run(scrape_urls(urls))
+
+        assert [p["store"] for p in products] == ["MENY", "Oda", "SPAR", "Coop"]
+
+
+_COOP_ARTICLE = (
+    '<article><div><div>39</div><div>90</div></div><h3><a href="/Weekly_offers'
+    '_listing_page?chain={chain}&amp;id=7040"> Egg 12pk</a></h3>Pr stk 3,33</article>'
+)
+
+
+class TestScrapeCoop:
+    def test_failed_chain_is_skipped_and_order_kept(self, mock_httpx):
+        def handler(request):
+            chain = request.url.params["chain"]
+            if chain == "coop-mega":
+                return httpx.Response(500)
+            return httpx.Response(200, text=_COOP_ARTICLE.format(chain=chain))
+
+        mock_httpx("src.onlinestores", handler)
+
+        with (
+            patch("src.onlinestores.DELAY_MIN", 0),
+            patch("src.onlinestores.DELAY_MAX", 0),
+        ):
+            products = asyncio.run(_scrape_coop())
+
+        assert [p["store"] for p in products] == ["Extra", "Coop Prix", "Obs"]
+        assert products[0]["price"] == 39.9
+
+
+class TestParseCoopHtml:
+    def test_entities_decoded(self):
+        html = (
+            '<article><h3><a href="/Weekly_offers_listing_page?chain=extra&amp;id=1">'
+            "Ben &amp; Jerry&#x27;s &quot;Cookie&quot;</a></h3>Pr kg 99,00"
+            '<img src="https://cdcimg.coop.no/p.jpg?w=1&amp;h=2"></article>'
+        )
+        (product,) = _parse_coop_html(html, "Extra")
+        assert product["name"] == 'Ben & Jerry\'s "Cookie"'
+        assert product["image"] == "https://cdcimg.coop.no/p.jpg?w=1&h=2"
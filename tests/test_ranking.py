@@ -2,7 +2,10 @@
 
 import json
 from pathlib import Path
-from unittest.mock import patch
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
 
 from src.ranking import (
     detect_triggers,
@@ -36,6 +39,30 @@ class TestRank:
         result = rank(items, top_n=5)
         assert len(result) == 1
 
+    def test_ties_keep_input_order(self):
+        items = [
+            {"name": "B", "normalized_unit_price": 20},
+            {"name": "X"},
+            {"name": "A1", "normalized_unit_price": 10},
+            {"name": "A2", "normalized_unit_price": 10},
+        ]
+        result = rank(items, top_n=3)
+        assert [r["name"] for r in result] == ["A1", "A2", "B"]
+
+
+@pytest.fixture
+def history(monkeypatch) -> SimpleNamespace:
+    """Stub out ranking's DB access; defaults describe a group's first run."""
+    mocks = SimpleNamespace(
+        get_all_time_best=MagicMock(return_value=None),
+        get_previous_best=MagicMock(return_value=None),
+        get_previous_top_ids=MagicMock(return_value=set()),
+        record_run=MagicMock(),
+    )
+    for name, mock in vars(mocks).items():
+        monkeypatch.setattr(f"src.ranking.{name}", mock)
+    return mocks
+
 
 class TestDetectTriggers:
     def _items(self, prices):
@@ -51,85 +78,62 @@ class TestDetectTriggers:
             for i, p in enumerate(prices)
         ]
 
-    @patch("src.ranking.record_run")
-    @patch("src.ranking.get_previous_top_ids", return_value=set())
-    @patch("src.ranking.get_previous_best", return_value=None)
-    @patch("src.ranking.get_all_time_best", return_value=None)
-    def test_new_best_on_first_run(self, mock_atb, mock_pb, mock_ids, mock_rec):
+    def test_new_best_on_first_run(self, history):
         items = self._items([50, 60, 70])
         triggers = detect_triggers("test", items)
         types = [t["type"] for t in triggers]
         assert "new_best" in types
 
-    @patch("src.ranking.record_run")
-    @patch("src.ranking.get_previous_top_ids", return_value={"kassal:0"})
-    @patch("src.ranking.get_previous_best", return_value={"best_price": 60})
-    @patch("src.ranking.get_all_time_best", return_value=60.0)
-    def test_new_best_when_cheaper(self, mock_atb, mock_pb, mock_ids, mock_rec):
+    def test_new_best_when_cheaper(self, history):
+        history.get_previous_top_ids.return_value = {"kassal:0"}
+        history.get_previous_best.return_value = {"best_price": 60}
+        history.get_all_time_best.return_value = 60.0
         items = self._items([50, 65, 70])
         triggers = detect_triggers("test", items)
         types = [t["type"] for t in triggers]
         assert "new_best" in types
 
-    @patch("src.ranking.record_run")
-    @patch("src.ranking.get_previous_top_ids", return_value={"kassal:0"})
-    @patch("src.ranking.get_previous_best", return_value={"best_price": 40})
-    @patch("src.ranking.get_all_time_best", return_value=40.0)
-    def test_no_new_best_when_same_or_higher(
-        self, mock_atb, mock_pb, mock_ids, mock_rec
-    ):
+    def test_no_new_best_when_same_or_higher(self, history):
+        history.get_previous_top_ids.return_value = {"kassal:0"}
+        history.get_previous_best.return_value = {"best_price": 40}
+        history.get_all_time_best.return_value = 40.0
         items = self._items([50, 60])
         triggers = detect_triggers("test", items)
         types = [t["type"] for t in triggers]
         assert "new_best" not in types
 
-    @patch("src.ranking.record_run")
-    @patch("src.ranking.get_previous_top_ids", return_value={"kassal:99"})
-    @patch("src.ranking.get_previous_best", return_value={"best_price": 100})
-    @patch("src.ranking.get_all_time_best", return_value=40.0)
-    def test_enters_top_n(self, mock_atb, mock_pb, mock_ids, mock_rec):
+    def test_enters_top_n(self, history):
+        history.get_previous_top_ids.return_value = {"kassal:99"}
+        history.get_previous_best.return_value = {"best_price": 100}
+        history.get_all_time_best.return_value = 40.0
         items = self._items([50, 60, 70])
         triggers = detect_triggers("test", items, top_n=3)
         types = [t["type"] for t in triggers]
         # All items are new entries (99 was previous)
         assert "enters_top_n" in types
 
-    @patch("src.ranking.record_run")
-    @patch("src.ranking.get_previous_top_ids", return_value=set())
-    @patch("src.ranking.get_previous_best", return_value=None)
-    @patch("src.ranking.get_all_time_best", return_value=None)
-    def test_below_threshold(self, mock_atb, mock_pb, mock_ids, mock_rec):
+    def test_below_threshold(self, history):
         items = self._items([80, 100, 120])
         triggers = detect_triggers("test", items, threshold=90)
         below = [t for t in triggers if t["type"] == "below_threshold"]
         assert len(below) == 1
         assert below[0]["price"] == "80.00"
 
-    @patch("src.ranking.record_run")
-    @patch("src.ranking.get_previous_top_ids", return_value=set())
-    @patch("src.ranking.get_previous_best", return_value={"best_price": 100})
-    @patch("src.ranking.get_all_time_best", return_value=80.0)
-    def test_price_drop_trigger(self, mock_atb, mock_pb, mock_ids, mock_rec):
+    def test_price_drop_trigger(self, history):
+        history.get_previous_best.return_value = {"best_price": 100}
+        history.get_all_time_best.return_value = 80.0
         items = self._items([80])  # 20% drop
         triggers = detect_triggers("test", items)
         types = [t["type"] for t in triggers]
         assert "price_drop" in types
 
-    @patch("src.ranking.record_run")
-    @patch("src.ranking.get_previous_top_ids", return_value=set())
-    @patch("src.ranking.get_previous_best", return_value=None)
-    @patch("src.ranking.get_all_time_best", return_value=None)
-    def test_empty_items_no_triggers(self, mock_atb, mock_pb, mock_ids, mock_rec):
+    def test_empty_items_no_triggers(self, history):
         assert detect_triggers("test", []) == []
 
-    @patch("src.ranking.record_run")
-    @patch("src.ranking.get_previous_top_ids", return_value=set())
-    @patch("src.ranking.get_previous_best", return_value=None)
-    @patch("src.ranking.get_all_time_best", return_value=None)
-    def test_records_to_db(self, mock_atb, mock_pb, mock_ids, mock_rec):
+    def test_records_to_db(self, history):
         items = self._items([50])
         detect_triggers("test", items)
-        mock_rec.assert_called_once()
+        history.record_run.assert_called_once()
 
 
 class TestFormatLeaderboard:
@@ -1,8 +1,17 @@
 """Tests for url_validator module — Kassal URL validation."""
 
+import asyncio
+
+import httpx
 import pytest
 
-from src.url_validator import _is_excluded_store, _build_search_url
+from src.url_validator import (
+    _build_search_url,
+    _is_excluded_store,
+    _listed_price,
+    _search_url,
+    validate_urls,
+)
 
 
 class TestIsExcludedStore:
@@ -102,3 +111,74 @@ class TestBuildSearchUrl:
         assert url is not None
         # URL should be encoded
         assert " " not in url.split("query=")[1].split("&")[0]
+
+    def test_repeated_store_and_name_is_cached(self):
+        _search_url.cache_clear()
+        first = _build_search_url({"store": "Meny", "name": "Egg"})
+        assert _build_search_url({"store": "meny ", "name": "Egg"}) is first
+        assert _search_url.cache_info().hits == 1
+
+
+class TestListedPrice:
+    def test_exact_store_wins_over_earlier_partial(self):
+        prices = {"eurospar": 49.9, "spar": 45.0}
+        assert _listed_price(prices, "spar") == 45.0
+
+    def test_partial_match_fallback(self):
+        assert _listed_price({"meny": 30.0}, "meny storo") == 30.0
+
+    def test_store_not_listed(self):
+        assert _listed_price({"meny": 30.0}, "joker") is None
+
+
+class TestValidateUrls:
+    def test_listing_cache_shared_across_calls(self, mock_httpx):
+        requests: list[str] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(str(request.url))
+            return httpx.Response(200, text='<div class="price-product-1"></div>')
+
+        mock_httpx("src.url_validator", handler)
+
+        item = {"source": "kassal", "source_id": "42", "store": "SPAR", "name": "Egg"}
+
+        async def run():
+            cache: dict = {}
+            first = await validate_urls([dict(item)], cache)
+            second = await validate_urls([dict(item)], cache)
+            return first, second
+
+        first, second = asyncio.run(run())
+
+        assert requests == ["https://kassal.app/vare/42"]
+        assert len(first) == len(second) == 1
+        assert "spar.no/sok" in second[0]["url"]
+
+    def test_dead_pages_dropped_and_prices_corrected(self, mock_httpx):
+        listing = (
+            '<div class="price-product-1"><img alt="SPAR" class="h-10 w-10">'
+            '<span class="text-green-600">kr 39,90</span></div>'
+        )
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path.endswith("/404"):
+                return httpx.Response(404, text="gone")
+            return httpx.Response(200, text=listing)
+
+        mock_httpx("src.url_validator", handler)
+
+        items = [
+            {"source": "kassal", "source_id": "404", "store": "SPAR", "name": "A"},
+            {
+                "source": "kassal",
+                "source_id": "7",
+                "store": "SPAR",
+                "name": "B",
+                "price": 45.0,
+            },
+        ]
+        result = asyncio.run(validate_urls(items))
+
+        assert [r["name"] for r in result] == ["B"]
+        assert result[0]["price"] == 39.9